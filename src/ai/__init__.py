@@ -2,7 +2,7 @@ from .astar import AStarAI
 from .bfs import BFSAI
 from .dfs import DFSAI
 from .dijkstra import DijkstraAI
-from .greedy import GreedyBestFirstAI
+from .greedy import GreedyBestFirstAI, SafeGreedyAI
 from .hamiltonian import HamiltonianWithShortcutsAI
 from .hybrid import HybridAI
 from .random_walk import RandomWalkAI
@@ -12,6 +12,8 @@ from .genetic import GeneticAI
 from .perfect_ai import PerfectAI
 from .reverse_astar import ReverseAStarAI
 from .smarter_hybrid import SmarterHybridAI
+from .minimax import ExpectimaxAI
+from .mcts import MCTSAI
 
 AI_ALGORITHMS = {
     "astar": AStarAI,
@@ -19,6 +21,7 @@ AI_ALGORITHMS = {
     "dfs": DFSAI,
     "dijkstra": DijkstraAI,
     "greedy": GreedyBestFirstAI,
+    "safe_greedy": SafeGreedyAI,
     "advanced_hamiltonian": HamiltonianWithShortcutsAI,
     "hybrid": HybridAI,
     "random": RandomWalkAI,
@@ -27,5 +30,7 @@ AI_ALGORITHMS = {
     "genetic": GeneticAI,
     "perfect": PerfectAI,
     "reverse_astar": ReverseAStarAI,
-    "smarter_hybrid": SmarterHybridAI
+    "smarter_hybrid": SmarterHybridAI,
+    "expectimax": ExpectimaxAI,
+    "mcts": MCTSAI
 }
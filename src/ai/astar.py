@@ -1,6 +1,7 @@
-from typing import List, Tuple, Dict, Set
+from typing import List, Tuple
 import heapq
 from .base import BaseAI
+from .virtual_snake import VirtualSnake
 
 class AStarAI(BaseAI):
     def __init__(self):
@@ -8,6 +9,12 @@ class AStarAI(BaseAI):
         self.name = "A* Pathfinding"
         self.description = "Finds optimal path using A* algorithm"
         self.current_path = []
+        self.virtual_snake = VirtualSnake(grid_size=self.grid_size)
+        self.trail = []  # Nodes from the start to where the virtual snake stands
+        area = self.grid_size * self.grid_size
+        self._closed = [0] * area
+        self._seen = [0] * area
+        self._stamp = 0
     
     def manhattan_distance(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> int:
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
@@ -30,58 +37,101 @@ class AStarAI(BaseAI):
         new_body = [new_head] + snake_body[:-1] if not growing else [new_head] + snake_body
         return new_body
 
+    def body_penalty(self, cell: int) -> int:
+        """calculate_heuristic's body penalty for the virtual snake's current
+        body, read off the occupancy of cell and its neighbors in O(1)"""
+        snake = self.virtual_snake
+        occupied = snake.occupied
+        near = occupied[cell]
+        for n in snake.neighbors[cell]:
+            near += occupied[n]
+        tail = snake.tail_cell
+        if tail == cell or tail in snake.neighbors[cell]:
+            near -= 1  # The tail will move
+        return 2 * near
+
+    def switch_to(self, node) -> None:
+        """Bring the virtual snake to the position node was reached in: undo
+        back to the deepest node it shares with the current trail, then
+        advance down node's branch"""
+        snake, trail = self.virtual_snake, self.trail
+        branch = []
+        while node.g_cost >= len(trail) or trail[node.g_cost] is not node:
+            branch.append(node)
+            node = node.parent
+        while len(trail) > node.g_cost + 1:
+            trail.pop()
+            snake.undo()
+        for node in reversed(branch):
+            snake.advance_cell(node.cell)
+            trail.append(node)
+
     def find_path(self, start: Tuple[int, int], goal: Tuple[int, int], snake_body: List[Tuple[int, int]], is_alternative_path: bool = False) -> List[Tuple[int, int]]:
         class Node:
-            def __init__(self, pos, snake_body, g_cost=0, h_cost=0, parent=None):
-                self.pos = pos
-                self.snake_body = snake_body
-                self.g_cost = g_cost
-                self.h_cost = h_cost
+            # No body per node: the virtual snake is moved between nodes
+            # with switch_to, so a node costs O(1) however long the snake
+            __slots__ = ('cell', 'g_cost', 'f_cost', 'parent')
+            def __init__(self, cell, g_cost=0, h_cost=0, parent=None):
+                self.cell = cell
+                self.g_cost = g_cost  # Also the node's depth in the search tree
                 self.f_cost = g_cost + h_cost
                 self.parent = parent
             def __lt__(self, other):
                 return self.f_cost < other.f_cost
-            def __eq__(self, other):
-                return self.pos == other.pos
-            def __hash__(self):
-                return hash(self.pos)
 
-        start_node = Node(start, snake_body, 0, self.calculate_heuristic(start, goal, snake_body))
+        snake = self.virtual_snake
+        snake.load(snake_body)
+        size = self.grid_size
+        goal_x, goal_y = goal
+        goal_cell = snake.cell_of(goal) if snake.in_bounds(goal) else -1
+        start_cell = snake.cell_of(start)
+        start_node = Node(start_cell, 0, self.calculate_heuristic(start, goal, snake_body))
+        self.trail = [start_node]
         open_set = [start_node]
-        closed_set: Set[Tuple[int, int]] = set()
-        came_from: Dict[Tuple[int, int], Node] = {start: start_node}
+        # Cells are closed or seen in this search when they hold its stamp.
+        # A cell is queued once, when first seen; a cheaper route found
+        # while it waits in the queue doesn't replace it
+        self._stamp += 1
+        stamp, closed, seen = self._stamp, self._closed, self._seen
+        seen[start_cell] = stamp
+        
+        closest = start_node  # Best node so far, returned if the budget runs out
+        closest_distance = self.manhattan_distance(start, goal)
         
         while open_set:
             current = heapq.heappop(open_set)
+            cell = current.cell
             
-            if current.pos == goal:
+            if cell == goal_cell or self.budget.exhausted():
+                if cell != goal_cell:
+                    current = closest
                 path = []
-                while current.pos != start:
-                    path.append(current.pos)
+                while current.cell != start_cell:
+                    path.append(snake.pos_of(current.cell))
                     current = current.parent
                 path.reverse()
                 return path
                 
-            closed_set.add(current.pos)
+            closed[cell] = stamp
+            distance = abs(cell % size - goal_x) + abs(cell // size - goal_y)
+            if distance < closest_distance:
+                closest, closest_distance = current, distance
             
             # Get valid neighbors considering future snake positions
-            for neighbor_pos in self.get_valid_neighbors(current.pos, current.snake_body):
-                if neighbor_pos in closed_set:
+            self.switch_to(current)
+            g_cost = current.g_cost + 1
+            for neighbor in snake.neighbors[cell]:
+                if snake.occupied[neighbor] or closed[neighbor] == stamp or seen[neighbor] == stamp:
                     continue
                 
-                # Simulate snake movement to this neighbor
-                is_growing = neighbor_pos == goal
-                new_snake_body = self.simulate_snake_movement(current.snake_body, neighbor_pos, is_growing)
+                # Simulate snake movement to this neighbor, eating on the goal
+                snake.advance_cell(neighbor, eat=neighbor == goal_cell)
+                h_cost = (abs(neighbor % size - goal_x) + abs(neighbor // size - goal_y) +
+                          self.body_penalty(neighbor))
+                snake.undo()
                 
-                g_cost = current.g_cost + 1
-                h_cost = self.calculate_heuristic(neighbor_pos, goal, new_snake_body)
-                
-                neighbor = Node(neighbor_pos, new_snake_body, g_cost, h_cost, current)
-                
-                if neighbor_pos not in came_from or g_cost < came_from[neighbor_pos].g_cost:
-                    came_from[neighbor_pos] = neighbor
-                    if neighbor not in open_set:
-                        heapq.heappush(open_set, neighbor)
+                seen[neighbor] = stamp
+                heapq.heappush(open_set, Node(neighbor, g_cost, h_cost, current))
         
         # If no path found and this isn't already an alternative path search
         if not is_alternative_path:
@@ -90,7 +140,7 @@ class AStarAI(BaseAI):
             best_score = float('inf')
             for pos in self.get_valid_neighbors(start, snake_body):
                 score = self.manhattan_distance(pos, goal)
-                if score < best_score and pos not in closed_set:
+                if score < best_score and closed[snake.cell_of(pos)] != stamp:
                     best_score = score
                     best_pos = pos
             
@@ -100,9 +150,16 @@ class AStarAI(BaseAI):
         
         return []
 
+    def plan(self, start: Tuple[int, int], goal: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """find_path through the move context, so AIs sharing it search
+        each position at most once; returns a fresh list"""
+        path = self.context.at(snake_body).memo(
+            'astar_path', (start, goal), lambda: self.find_path(start, goal, snake_body))
+        return list(path)
+
     def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
         # Always recalculate path to handle dynamic situations better
-        self.current_path = self.find_path(snake_head, food_pos, snake_body)
+        self.current_path = self.plan(snake_head, food_pos, snake_body)
         
         if self.current_path:
             next_pos = self.current_path[0]
@@ -1,5 +1,68 @@
-from typing import List, Tuple
+import time
+from typing import List, Tuple, Optional, Sequence, TYPE_CHECKING
+import numpy as np
 from src.utils.settings import GRID_SIZE
+from .context import MoveContext
+
+if TYPE_CHECKING:
+    from src.game.engine import Engine
+
+# Neighbor offsets in get_valid_neighbors order, for batched move selection
+BATCH_OFFSETS = np.array([(0, 1), (1, 0), (0, -1), (-1, 0)])
+
+def batch_candidates(heads: np.ndarray, occupancy: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """The four neighbor positions of every head, shape (K, 4, 2), and
+    whether each is on the board and unoccupied, shape (K, 4)"""
+    size = occupancy.shape[1]
+    candidates = heads[:, None, :] + BATCH_OFFSETS[None, :, :]
+    on_board = ((candidates >= 0) & (candidates < size)).all(axis=2)
+    x = np.clip(candidates[:, :, 0], 0, size - 1)
+    y = np.clip(candidates[:, :, 1], 0, size - 1)
+    games = np.arange(len(heads))[:, None]
+    return candidates, on_board & ~occupancy[games, y, x]
+
+def moves_from_choice(choice: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """(K, 2) moves for the chosen candidate indices, (0, 0) where no candidate was valid"""
+    moves = BATCH_OFFSETS[choice].copy()
+    moves[~valid.any(axis=1)] = 0
+    return moves
+
+class MoveBudget:
+    """Time and node allowance for a single get_next_move call.
+
+    Composite AIs share one budget with their sub-AIs so every search made
+    during a move draws from the same deadline.
+    """
+    CHECK_INTERVAL = 16  # Nodes between clock reads
+
+    def __init__(self, time_limit: Optional[float] = None, max_nodes: Optional[int] = None):
+        self.time_limit = time_limit  # Seconds per move, None for unlimited
+        self.max_nodes = max_nodes    # Expanded nodes per move, None for unlimited
+        self.active = False
+        self.deadline = None
+        self.nodes = 0
+        self.truncated = False
+
+    def start(self) -> None:
+        """Reset counters and start the clock for a new move"""
+        self.nodes = 0
+        self.truncated = False
+        self.active = self.time_limit is not None or self.max_nodes is not None
+        self.deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+
+    def exhausted(self) -> bool:
+        """Count one expanded node and report whether the budget has run out"""
+        if not self.active:
+            return False
+        if self.truncated:
+            return True
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            self.truncated = True
+        elif (self.deadline is not None and self.nodes % self.CHECK_INTERVAL == 0 and
+              time.perf_counter() >= self.deadline):
+            self.truncated = True
+        return self.truncated
 
 class BaseAI:
     def __init__(self, name="Base AI"):
@@ -7,10 +70,102 @@ class BaseAI:
         self.description = "Base AI class"
         self.grid_size = GRID_SIZE
         self.current_path = []  # For visualization
+        self.budget = MoveBudget()
+        self.context = MoveContext(self.grid_size)  # Per-position facts, see MoveContext
+        self.sub_ais: List['BaseAI'] = []  # Set by share_budget
         
     def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
         raise NotImplementedError
 
+    def reset(self, board: Optional['Engine'] = None) -> None:
+        """Get ready for a new game on board (the Engine about to be
+        played, when there is one), so one instance can play any number of
+        games. Override to drop per-game state; tables that depend only on
+        the board size belong in module-level caches shared by every
+        instance, and are kept. Sub-AIs are reset along with this one."""
+        self.current_path = []
+        for ai in self.sub_ais:
+            ai.reset(board)
+
+    # Engine events, sent while a game is played for real (never for
+    # make/unmake look-ahead) to the AI playing it, so it can keep
+    # incremental state up to date instead of rebuilding it from the body
+    # every move. BatchSimulator, which plays many games through one AI,
+    # sends none, so get_next_move must still work without them. The
+    # defaults pass each event on to the sub-AIs.
+
+    def on_game_start(self, board: 'Engine') -> None:
+        """A new game starts on board; resets the AI (and its sub-AIs)"""
+        self.reset(board)
+
+    def on_step(self, head_added: Tuple[int, int], tail_removed: Optional[Tuple[int, int]]) -> None:
+        """The head moved onto head_added and the tail left tail_removed
+        (None when the snake grew instead)"""
+        for ai in self.sub_ais:
+            ai.on_step(head_added, tail_removed)
+
+    def on_grow(self) -> None:
+        """The head reached the food; the snake grows on its next move"""
+        for ai in self.sub_ais:
+            ai.on_grow()
+
+    def on_food_spawned(self, pos: Tuple[int, int]) -> None:
+        """New food appeared at pos"""
+        for ai in self.sub_ais:
+            ai.on_food_spawned(pos)
+
+    def on_game_end(self, reason: str) -> None:
+        """The game is over: "wall", "self", "board_full", or why the runner stopped it"""
+        for ai in self.sub_ais:
+            ai.on_game_end(reason)
+
+    # AIs whose get_next_moves doesn't need the ordered bodies
+    batch_native = False
+
+    # AIs whose move depends only on the position, so a repeated position
+    # without eating means the game is going round in a loop
+    deterministic = True
+
+    def get_next_moves(self, heads: np.ndarray, foods: np.ndarray, occupancy: np.ndarray,
+                       bodies: Optional[Sequence[List[Tuple[int, int]]]] = None) -> np.ndarray:
+        """Moves for K games at once.
+
+        heads and foods are (K, 2) arrays of (x, y), occupancy is a
+        (K, size, size) boolean array indexed [game, y, x]. Returns a (K, 2)
+        array of moves. This default plays the games one at a time through
+        get_next_move and needs the head-first bodies; AIs that set
+        batch_native decide from the arrays alone.
+        """
+        if bodies is None:
+            raise ValueError(f"{self.name} needs the snake bodies to choose batched moves")
+        moves = np.zeros((len(heads), 2), dtype=int)
+        for k, body in enumerate(bodies):
+            self.begin_move()
+            moves[k] = self.get_next_move(body[0], (int(foods[k][0]), int(foods[k][1])), body)
+        return moves
+
+    def set_move_budget(self, time_limit: Optional[float] = None, max_nodes: Optional[int] = None) -> None:
+        """Limit each move to time_limit seconds and/or max_nodes expansions"""
+        self.budget.time_limit = time_limit
+        self.budget.max_nodes = max_nodes
+
+    def begin_move(self) -> None:
+        """Start the budget for the next move (called by the engine)"""
+        self.budget.start()
+
+    @property
+    def truncated(self) -> bool:
+        """Whether the last move was cut short by the budget"""
+        return self.budget.truncated
+
+    def share_budget(self, *sub_ais: 'BaseAI') -> None:
+        """Make sub-AIs draw from this AI's budget, read from its move
+        context and follow its resets"""
+        for ai in sub_ais:
+            ai.budget = self.budget
+            ai.context = self.context
+            self.sub_ais.append(ai)
+
     def get_valid_neighbors(self, pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
         """Get valid neighboring positions"""
         neighbors = []
@@ -1,29 +1,19 @@
 from typing import List, Tuple
-from collections import deque
 from .base import BaseAI
+from .search import GridSearch
 
 class BFSAI(BaseAI):
-    def __init__(self):
+    def __init__(self, bidirectional: bool = False, time_aware: bool = False):
         super().__init__()
         self.name = "BFS Pathfinding"
         self.description = "Uses Breadth-First Search to find path to food"
         self.current_path = []
+        self.bidirectional = bidirectional  # Search from both ends and meet in the middle
+        self.time_aware = time_aware        # Let paths use cells the tail will have left
+        self.search = GridSearch(self.grid_size)
 
     def find_path(self, start: Tuple[int, int], goal: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
-        queue = deque([(start, [])])
-        visited = {start}
-        
-        while queue:
-            current, path = queue.popleft()
-            if current == goal:
-                return path
-                
-            for next_pos in self.get_valid_neighbors(current, snake_body):
-                if next_pos not in visited:
-                    visited.add(next_pos)
-                    new_path = path + [next_pos]
-                    queue.append((next_pos, new_path))
-        return []
+        return self.search.find_path(start, goal, snake_body, self.bidirectional, self.time_aware, self.budget)
 
     def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
         if not self.current_path:
@@ -0,0 +1,143 @@
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+from .virtual_snake import VirtualSnake, serpentine_cycle
+from src.utils.settings import GRID_SIZE
+
+class MoveContext:
+    """Facts about the position a move is being chosen for, each computed
+    the first time it is asked for and kept until the position changes.
+
+    Every AI has one in self.context; share_budget hands a composite AI's
+    context to its sub-AIs, so when several of them ask for the same flood
+    fill or the same A* path in one move, it is worked out once. Call
+    at(snake_body) to get the context for the body get_next_move was
+    given; it starts over whenever that is a different position.
+
+    Facts computed while the move budget had run out are kept like any
+    other, so later requests in the same move see the partial result
+    rather than an even more truncated one.
+    """
+
+    def __init__(self, grid_size: int = GRID_SIZE, caching: bool = True):
+        self.grid_size = grid_size
+        self.area = grid_size * grid_size
+        self.caching = caching  # False recomputes every request, for benchmarks
+        # Loaded with the position on first use; anyone advancing it rewinds it
+        self.snake = VirtualSnake(grid_size=grid_size)
+        self.snake_body: Sequence[Tuple[int, int]] = ()
+        self._key: Optional[Tuple] = None
+        self._loaded = False
+        self._facts: Dict[Tuple[str, Hashable], object] = {}
+        # Requests and actual computations of each fact, since creation
+        self.requests: Dict[str, int] = {}
+        self.computations: Dict[str, int] = {}
+
+    def at(self, snake_body: Sequence[Tuple[int, int]]) -> 'MoveContext':
+        """This context, moved to snake_body's position if it isn't there.
+        Bodies are treated as read-only, so the same list with the same
+        head, tail and length is the same position."""
+        key = (len(snake_body), snake_body[0], snake_body[-1])
+        if snake_body is not self.snake_body or key != self._key:
+            self.snake_body = snake_body
+            self._key = key
+            self._loaded = False
+            self._facts.clear()
+        return self
+
+    def memo(self, name: str, key: Hashable, compute: Callable[[], object]):
+        """compute() for (name, key), at most once per position"""
+        self.requests[name] = self.requests.get(name, 0) + 1
+        fact = (name, key)
+        if self.caching and fact in self._facts:
+            return self._facts[fact]
+        self.computations[name] = self.computations.get(name, 0) + 1
+        value = compute()
+        self._facts[fact] = value
+        return value
+
+    def loaded(self) -> VirtualSnake:
+        """The virtual snake, holding the current position"""
+        if not self._loaded:
+            self.snake.load(self.snake_body)
+            self._loaded = True
+        return self.snake
+
+    # Facts about the position
+
+    @property
+    def occupancy(self) -> bytearray:
+        """Body segments per cell id"""
+        return self.loaded().occupied
+
+    @property
+    def free_count(self) -> int:
+        return self.area - len(self.snake_body)
+
+    @property
+    def cycle_index(self) -> Dict[Tuple[int, int], int]:
+        """Each cell's index on the serpentine Hamiltonian cycle"""
+        return serpentine_cycle(self.grid_size)[1]
+
+    def distances(self, budget=None) -> List[int]:
+        """Moves from the head to every cell through free cells, -1 where unreachable"""
+        return self.memo('distances', None, lambda: self._distances(budget))
+
+    def _distances(self, budget) -> List[int]:
+        snake = self.loaded()
+        occupied, neighbors = snake.occupied, snake.neighbors
+        distance = [-1] * self.area
+        head = snake.head_cell
+        distance[head] = 0
+        queue = [head]
+        for cell in queue:
+            if budget is not None and budget.exhausted():
+                break
+            for n in neighbors[cell]:
+                if distance[n] < 0 and not occupied[n]:
+                    distance[n] = distance[cell] + 1
+                    queue.append(n)
+        return distance
+
+    def can_move(self, pos: Tuple[int, int]) -> bool:
+        """Whether the head may move to pos (the tail cell blocks, as in Snake.move)"""
+        snake = self.loaded()
+        return snake.in_bounds(pos) and snake.can_enter(snake.cell_of(pos))
+
+    def free_neighbors_after(self, pos: Tuple[int, int]) -> int:
+        """Free cells next to the head after moving to pos, 0 if it can't"""
+        return self.memo('free_neighbors_after', pos, lambda: self._after(
+            pos, 0, lambda snake: snake.free_neighbors(snake.head_cell)))
+
+    def reachable_after(self, pos: Tuple[int, int], budget=None) -> int:
+        """Cells the head can reach after moving to pos, 0 if it can't"""
+        return self.memo('reachable_after', pos, lambda: self._after(
+            pos, 0, lambda snake: snake.count_reachable(budget=budget)))
+
+    def tail_reachable_after(self, pos: Tuple[int, int], budget=None) -> bool:
+        """Whether the head can still get to its tail after moving to pos
+        (False when the budget ran out before that was shown)"""
+        return self.memo('tail_reachable_after', pos, lambda: self._after(
+            pos, False, lambda snake: snake.can_reach_tail(budget)))
+
+    def _after(self, pos: Tuple[int, int], blocked, measure: Callable[[VirtualSnake], object]):
+        snake = self.loaded()
+        if not snake.advance(pos):
+            return blocked
+        value = measure(snake)
+        snake.undo()
+        return value
+
+    def reachable_from(self, pos: Tuple[int, int], budget=None) -> int:
+        """Cells reachable from pos (itself included) with the tail cell
+        counted free, since it moves away; 0 if pos is off the board or on
+        the rest of the body"""
+        return self.memo('reachable_from', pos, lambda: self._reachable_from(pos, budget))
+
+    def _reachable_from(self, pos: Tuple[int, int], budget) -> int:
+        snake = self.loaded()
+        if not snake.in_bounds(pos):
+            return 0
+        tail = snake.tail_cell
+        snake.occupied[tail] -= 1
+        count = 0 if snake.occupied[snake.cell_of(pos)] else snake.count_reachable(pos, budget)
+        snake.occupied[tail] += 1
+        return count
@@ -1,6 +1,6 @@
-from typing import List, Tuple, Set, Dict, Optional
+from typing import List, Tuple, Optional
 from .base import BaseAI
-from collections import deque
+from .search import GridSearch
 import logging
 
 class DFSAI(BaseAI):
@@ -9,37 +9,25 @@ class DFSAI(BaseAI):
         self.name = "DFS Exploration"
         self.description = "Depth-first search for shortest path"
         self.current_path = []
-        self.visited: Set[Tuple[int, int]] = set()
+        self.search = GridSearch(self.grid_size)
 
-    def dfs(self, start: Tuple[int, int], goal: Tuple[int, int], snake_body: List[Tuple[int, int]], max_depth: int = 30) -> Optional[List[Tuple[int, int]]]:
-        """Perform DFS to find path to food"""
-        stack = [(start, [start])]
-        visited = set([start])  # Only mark cells we've actually visited
-        snake_set = set(snake_body)  # Convert snake body to set for faster lookups
-        
-        while stack:
-            current, path = stack.pop()
-            
-            # If path is too long, skip this branch
-            if len(path) > max_depth:
-                continue
-                
-            if current == goal:
-                logging.debug(f"DFS found path of length {len(path)}")
-                return path
-                
-            # Get valid neighbors not in snake body
-            neighbors = self.get_valid_neighbors(current, snake_body)
-            # Sort neighbors by distance to goal for better paths
-            neighbors.sort(key=lambda pos: abs(pos[0] - goal[0]) + abs(pos[1] - goal[1]))
-            
-            for next_pos in neighbors:
-                if next_pos not in visited and next_pos not in snake_set:
-                    visited.add(next_pos)
-                    stack.append((next_pos, path + [next_pos]))
-        
-        logging.debug("DFS found no path to food")
-        return None
+    def dfs(self, start: Tuple[int, int], goal: Tuple[int, int], snake_body: List[Tuple[int, int]], max_depth: Optional[int] = None) -> Optional[List[Tuple[int, int]]]:
+        """Iterative-deepening DFS (IDA* with the Manhattan bound) to the food"""
+        search = self.search
+        if not (0 <= goal[0] < self.grid_size and 0 <= goal[1] < self.grid_size):
+            return None
+        search.load(snake_body)
+        cells = search.ida_star(search.cell_of(start), search.cell_of(goal), max_depth, self.budget)
+        logging.debug(f"DFS expansions per depth: {search.expansions_per_depth}")
+        if not cells:
+            logging.debug("DFS found no path to food")
+            return None
+        path = [start] + [search.pos_of(cell) for cell in cells]
+        if path[-1] == goal:
+            logging.debug(f"DFS found path of length {len(path)}")
+        else:
+            logging.debug("DFS ran out of budget")
+        return path
 
     def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
         # Try to find path to food
@@ -60,9 +48,4 @@ class DFSAI(BaseAI):
             self.current_path = [next_pos]
             return (next_pos[0] - snake_head[0], next_pos[1] - snake_head[1])
         
-        return (0, 0)  # No valid moves
-
-    def reset(self):
-        """Reset the visited set when starting a new game"""
-        self.visited.clear()
-        self.current_path = []
\ No newline at end of file
+        return (0, 0)  # No valid moves
\ No newline at end of file
@@ -1,40 +1,21 @@
-from typing import List, Tuple, Dict, Set
-import heapq
+from typing import List, Tuple
 from .base import BaseAI
+from .search import GridSearch
 
 class DijkstraAI(BaseAI):
-    def __init__(self):
+    def __init__(self, bidirectional: bool = False, time_aware: bool = False):
         super().__init__()
         self.name = "Dijkstra"
         self.description = "Finds shortest path without heuristics"
         self.current_path = []
+        self.bidirectional = bidirectional  # Search from both ends and meet in the middle
+        self.time_aware = time_aware        # Let paths use cells the tail will have left
+        self.search = GridSearch(self.grid_size)
     
     def find_path(self, start: Tuple[int, int], goal: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
-        # Priority queue of (cost, position, path)
-        queue = [(0, start, [])]
-        visited: Set[Tuple[int, int]] = {start}
-        costs: Dict[Tuple[int, int], int] = {start: 0}
-        
-        while queue:
-            current_cost, current, path = heapq.heappop(queue)
-            
-            if current == goal:
-                return path + [current]
-            
-            # Get valid neighbors
-            neighbors = self.get_valid_neighbors(current, snake_body)
-            
-            # Add neighbors to queue with cumulative cost
-            for next_pos in neighbors:
-                new_cost = current_cost + 1  # Each step costs 1
-                
-                if next_pos not in costs or new_cost < costs[next_pos]:
-                    costs[next_pos] = new_cost
-                    visited.add(next_pos)
-                    new_path = path + [current]
-                    heapq.heappush(queue, (new_cost, next_pos, new_path))
-        
-        return []
+        # Every step costs 1, so the breadth-first layer gives the same distances
+        path = self.search.find_path(start, goal, snake_body, self.bidirectional, self.time_aware, self.budget)
+        return [start] + path if path else []
     
     def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
         # Find path to food
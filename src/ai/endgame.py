@@ -0,0 +1,200 @@
+from typing import List, Tuple, Dict, Optional
+import logging
+import os
+import pickle
+from .virtual_snake import VirtualSnake
+from src.utils.settings import GRID_SIZE
+
+# Where decision tables are kept: endgame_tables/ at the top of the
+# checkout, wherever the game is started from, unless SNAKE_ENDGAME_TABLES
+# names another directory
+TABLE_DIR = os.environ.get("SNAKE_ENDGAME_TABLES", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "endgame_tables"))
+
+# Decision tables shared by every solver in the process, keyed by file path
+_tables: Dict[str, Dict[tuple, int]] = {}
+_symmetry_tables: Dict[int, List[Tuple[List[int], List[int]]]] = {}
+
+def symmetry_tables(grid_size: int) -> List[Tuple[List[int], List[int]]]:
+    """(forward, inverse) cell maps for the 8 symmetries of the square board"""
+    tables = _symmetry_tables.get(grid_size)
+    if tables is None:
+        n = grid_size - 1
+        transforms = [
+            lambda x, y: (x, y), lambda x, y: (n - x, y),
+            lambda x, y: (x, n - y), lambda x, y: (n - x, n - y),
+            lambda x, y: (y, x), lambda x, y: (n - y, x),
+            lambda x, y: (y, n - x), lambda x, y: (n - y, n - x),
+        ]
+        tables = []
+        for transform in transforms:
+            forward = [0] * (grid_size * grid_size)
+            inverse = [0] * (grid_size * grid_size)
+            for cell in range(grid_size * grid_size):
+                x, y = transform(cell % grid_size, cell // grid_size)
+                forward[cell] = y * grid_size + x
+                inverse[y * grid_size + x] = cell
+            tables.append((forward, inverse))
+        _symmetry_tables[grid_size] = tables
+    return tables
+
+class _Aborted(Exception):
+    """Raised when the move budget runs out mid-solve"""
+
+class EndgameSolver:
+    """Exact look-ahead for nearly full boards.
+
+    Once at most `threshold` cells are free, a memoized DFS over
+    (head, occupancy, moves left) finds a move that reaches the food with
+    the tail still reachable, or failing that the move that survives
+    longest. Root decisions are cached in a table keyed by head, food,
+    free cells and the order of the tail cells that free up within the
+    horizon (plus the tail after a meal on its last move), canonicalized
+    over the board's symmetries, shared between games in memory and
+    persisted to disk.
+    """
+
+    def __init__(self, threshold: int = 12, horizon: Optional[int] = None,
+                 grid_size: int = GRID_SIZE, autosave_every: int = 50,
+                 table_dir: Optional[str] = None):
+        self.threshold = threshold
+        self.horizon = horizon if horizon is not None else 2 * threshold
+        self.grid_size = grid_size
+        self.autosave_every = autosave_every
+        self.snake = VirtualSnake(grid_size=grid_size)
+        self.symmetries = symmetry_tables(grid_size)
+        self.table_dir = table_dir if table_dir is not None else TABLE_DIR
+        self.path = os.path.join(self.table_dir, f"endgame_{grid_size}_{self.horizon}.pkl")
+        self.table = self._load_table()
+        self.unsaved = 0
+        self.memo: Dict[tuple, Tuple[bool, int]] = {}
+        self.food = -1
+        self.hits = 0
+        self.misses = 0
+
+    def _load_table(self) -> Dict[tuple, int]:
+        key = self.path
+        if key not in _tables:
+            table = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, 'rb') as f:
+                        table = pickle.load(f)
+                except (OSError, pickle.UnpicklingError, EOFError) as e:
+                    logging.error(f"Could not load endgame table {self.path}: {str(e)}")
+            _tables[key] = table
+        return _tables[key]
+
+    def save(self) -> None:
+        """Write the decision table to disk"""
+        os.makedirs(self.table_dir, exist_ok=True)
+        with open(self.path, 'wb') as f:
+            pickle.dump(self.table, f)
+        self.unsaved = 0
+
+    def applies(self, snake_body: List[Tuple[int, int]]) -> bool:
+        return self.grid_size * self.grid_size - len(snake_body) <= self.threshold
+
+    def canonical_key(self, head: int, food: int, free: List[int],
+                      tail: Tuple[int, ...]) -> Tuple[tuple, List[int], List[int]]:
+        """Smallest key over the board symmetries, with the maps into and out of that frame"""
+        best = None
+        for forward, inverse in self.symmetries:
+            key = (forward[head], forward[food], tuple(sorted(forward[c] for c in free)),
+                   tuple(forward[c] for c in tail))
+            if best is None or key < best[0]:
+                best = (key, forward, inverse)
+        return best
+
+    def _search(self, depth: int, budget) -> Tuple[bool, int]:
+        """(reaches food safely, score): soonest meal if True, else steps survived"""
+        if budget is not None and budget.exhausted():
+            raise _Aborted()
+        snake = self.snake
+        # Lines stop at the food, so every move below the root frees one
+        # tail cell: the depth left fixes which cells free up from here on,
+        # and the tail order needn't be part of the key
+        key = (snake.head_cell, snake.hash, depth)
+        result = self.memo.get(key)
+        if result is not None:
+            return result
+
+        best = (False, 0)  # No legal move: dead now
+        occupied = snake.occupied
+        for cell in snake.neighbors[snake.head_cell]:
+            if occupied[cell]:
+                continue
+            if cell == self.food:
+                snake.advance_cell(cell, eat=True)
+                result = (True, depth) if snake.can_reach_tail() else (False, 1)
+                snake.undo()
+            elif depth == 1:
+                result = (False, 1)
+            else:
+                snake.advance_cell(cell)
+                won, score = self._search(depth - 1, budget)
+                snake.undo()
+                result = (won, score) if won else (False, score + 1)
+            if result > best:
+                best = result
+
+        self.memo[key] = best
+        return best
+
+    def solve_cell(self, budget=None) -> Optional[int]:
+        """Best next head cell for the loaded position, None if there is no legal move"""
+        snake = self.snake
+        best_cell, best = None, None
+        occupied = snake.occupied
+        for cell in snake.neighbors[snake.head_cell]:
+            if occupied[cell]:
+                continue
+            if cell == self.food:
+                snake.advance_cell(cell, eat=True)
+                result = (True, self.horizon) if snake.can_reach_tail() else (False, 1)
+                snake.undo()
+            else:
+                snake.advance_cell(cell)
+                won, score = self._search(self.horizon - 1, budget) if self.horizon > 1 else (False, 0)
+                snake.undo()
+                result = (won, score) if won else (False, score + 1)
+            if best is None or result > best:
+                best_cell, best = cell, result
+        return best_cell
+
+    def solve(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int],
+              snake_body: List[Tuple[int, int]], budget=None) -> Optional[Tuple[int, int]]:
+        """Move for a nearly full board, or None if the solver has no answer"""
+        snake = self.snake
+        if not snake.in_bounds(food_pos):
+            return None
+        snake.load(snake_body)
+        self.food = snake.cell_of(food_pos)
+        head = snake.head_cell
+        free = [cell for cell in range(snake.area) if not snake.occupied[cell]]
+        key, forward, inverse = self.canonical_key(head, self.food, free, snake.tail_segment(self.horizon + 1))
+
+        canonical_cell = self.table.get(key)
+        if canonical_cell is not None:
+            self.hits += 1
+            cell = inverse[canonical_cell]
+        else:
+            self.misses += 1
+            self.memo.clear()
+            try:
+                cell = self.solve_cell(budget)
+            except _Aborted:
+                snake.load(snake_body)
+                return None  # Incomplete answers are not cached
+            if cell is None:
+                return None
+            self.table[key] = forward[cell]
+            self.unsaved += 1
+            if self.unsaved >= self.autosave_every:
+                try:
+                    self.save()
+                except OSError as e:
+                    logging.error(f"Could not save endgame table {self.path}: {str(e)}")
+
+        next_pos = snake.pos_of(cell)
+        return (next_pos[0] - snake_head[0], next_pos[1] - snake_head[1])
@@ -1,7 +1,165 @@
 from typing import List, Tuple
 import random
 import numpy as np
-from .base import BaseAI
+from .base import BaseAI, batch_candidates, moves_from_choice
+
+# Order of the behavior weights when packed into a vector
+GENE_NAMES = ['food_distance', 'wall_distance', 'tail_distance', 'space_freedom']
+
+# Candidate moves in get_valid_neighbors order
+MOVE_OFFSETS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+# Candidates from the largest new head position down: equal scores go to
+# the largest position, as when moves were chosen by max((score, pos))
+TIE_ORDER = [1, 0, 2, 3]
+
+_wall_tables = {}
+
+def wall_distance_table(grid_size: int) -> List[int]:
+    """Distance from every cell (y * size + x) to the nearest edge, shared per board size"""
+    table = _wall_tables.get(grid_size)
+    if table is None:
+        table = [min(x, y, grid_size - 1 - x, grid_size - 1 - y)
+                 for y in range(grid_size) for x in range(grid_size)]
+        _wall_tables[grid_size] = table
+    return table
+
+def move_features(snake_head: Tuple[int, int], food_pos: Tuple[int, int],
+                  snake_body: List[Tuple[int, int]], grid_size: int) -> Tuple[List[List[float]], List[bool]]:
+    """Raw features of the four candidate moves, in MOVE_OFFSETS order.
+
+    Returns (features, valid): per candidate the food distance, wall
+    distance, distance to the nearest body segment after the head (-1 for
+    a one-cell snake) and free neighbor count, and whether the candidate is
+    on the board and off the body. The body is scanned once for all four
+    candidates: a candidate one step from the head is one closer to each
+    segment on its side of the head and one further from every other.
+    """
+    hx, hy = snake_head
+    far = grid_size * 2 + 2
+    down = right = up = left = far
+    for x, y in snake_body[1:]:
+        dx, dy = x - hx, y - hy
+        d = (dx if dx >= 0 else -dx) + (dy if dy >= 0 else -dy)
+        if dy > 0:
+            if d - 1 < down:
+                down = d - 1
+            if d + 1 < up:
+                up = d + 1
+        else:
+            if d + 1 < down:
+                down = d + 1
+            if dy < 0 and d - 1 < up:
+                up = d - 1
+            elif d + 1 < up:
+                up = d + 1
+        if dx > 0:
+            if d - 1 < right:
+                right = d - 1
+            if d + 1 < left:
+                left = d + 1
+        else:
+            if d + 1 < right:
+                right = d + 1
+            if dx < 0 and d - 1 < left:
+                left = d - 1
+            elif d + 1 < left:
+                left = d + 1
+    tail_distances = [-1 if d == far else d for d in (down, right, up, left)]
+
+    occupied = set(snake_body)
+    walls = wall_distance_table(grid_size)
+    fx, fy = food_pos
+    features, valid = [], []
+    for (ox, oy), tail_distance in zip(MOVE_OFFSETS, tail_distances):
+        x, y = hx + ox, hy + oy
+        if not (0 <= x < grid_size and 0 <= y < grid_size) or (x, y) in occupied:
+            features.append(None)
+            valid.append(False)
+            continue
+        free = 0
+        for nx, ny in ((x, y + 1), (x + 1, y), (x, y - 1), (x - 1, y)):
+            if 0 <= nx < grid_size and 0 <= ny < grid_size and (nx, ny) not in occupied:
+                free += 1
+        features.append([abs(x - fx) + abs(y - fy), walls[y * grid_size + x], tail_distance, free])
+        valid.append(True)
+    return features, valid
+
+_distance_tables = {}
+
+def distance_table(grid_size: int) -> np.ndarray:
+    """Manhattan distance between every pair of cells, shared per board size"""
+    table = _distance_tables.get(grid_size)
+    if table is None:
+        cells = np.arange(grid_size * grid_size)
+        x, y = cells % grid_size, cells // grid_size
+        table = (np.abs(x[:, None] - x[None, :]) + np.abs(y[:, None] - y[None, :])).astype(np.int16)
+        _distance_tables[grid_size] = table
+    return table
+
+def batch_move_features(heads: np.ndarray, foods: np.ndarray,
+                        occupancy: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """move_features for K games: (K, 4, 4) raw features and (K, 4) valid mask"""
+    k, size = len(heads), occupancy.shape[1]
+    candidates, valid = batch_candidates(heads, occupancy)
+    x = np.clip(candidates[:, :, 0], 0, size - 1)
+    y = np.clip(candidates[:, :, 1], 0, size - 1)
+    games = np.arange(k)[:, None]
+
+    features = np.empty((k, 4, 4))
+    features[:, :, 0] = np.abs(candidates - foods[:, None, :]).sum(axis=2)
+    features[:, :, 1] = np.minimum(candidates, size - 1 - candidates).min(axis=2)
+
+    # Nearest occupied cell other than the head
+    segments = occupancy.reshape(k, -1).copy()
+    segments[np.arange(k), heads[:, 1] * size + heads[:, 0]] = False
+    distances = distance_table(size)[y * size + x]  # (K, 4, cells)
+    far = size * 2 + 2
+    nearest = np.where(segments[:, None, :], distances, far).min(axis=2)
+    features[:, :, 2] = np.where(nearest == far, -1, nearest)
+
+    padded = np.pad(occupancy, ((0, 0), (2, 2), (2, 2)), constant_values=True)
+    px, py = candidates[:, :, 0] + 2, candidates[:, :, 1] + 2
+    features[:, :, 3] = 4 - (padded[games, py + 1, px].astype(int) + padded[games, py - 1, px] +
+                             padded[games, py, px + 1] + padded[games, py, px - 1])
+    return features, valid
+
+def normalize_features(features: List[List[float]], scales: List[float], offsets: List[float],
+                       no_tail: float) -> List[List[float]]:
+    """Scale and shift raw feature rows in place; a missing tail distance scores no_tail"""
+    for row in features:
+        if row is not None:
+            tail = row[2]
+            for i, (scale, offset) in enumerate(zip(scales, offsets)):
+                row[i] = row[i] * scale + offset
+            if tail < 0:
+                row[2] = no_tail
+    return features
+
+def batch_best_moves(heads: np.ndarray, foods: np.ndarray, occupancy: np.ndarray,
+                     transform: Tuple[List[float], List[float], float], weights: List[float]) -> np.ndarray:
+    """Highest scoring valid move of each of K games, (0, 0) where there is none"""
+    features, valid = batch_move_features(heads, foods, occupancy)
+    scales, offsets, no_tail = transform
+    no_tail_rows = features[:, :, 2] < 0
+    features = features * scales + offsets
+    features[:, :, 2][no_tail_rows] = no_tail
+    scores = features @ np.array(weights)
+    order = np.array(TIE_ORDER)
+    choice = order[np.argmax(np.where(valid, scores, -np.inf)[:, order], axis=1)]
+    return moves_from_choice(choice, valid)
+
+def best_move(snake_head: Tuple[int, int], features: List[List[float]], valid: List[bool],
+              weights: List[float]) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """(direction, new head) of the valid candidate with the highest
+    weighted score, the one with the largest new head on a tie"""
+    best_index, best_score = -1, 0.0
+    for index in TIE_ORDER:
+        if valid[index]:
+            score = sum(w * f for w, f in zip(weights, features[index]))
+            if best_index < 0 or score > best_score:
+                best_index, best_score = index, score
+    dx, dy = MOVE_OFFSETS[best_index]
+    return (dx, dy), (snake_head[0] + dx, snake_head[1] + dy)
 
 class GeneticAI(BaseAI):
     def __init__(self, weights=None):
@@ -23,6 +181,28 @@ class GeneticAI(BaseAI):
         
         self.fitness = 0  # Track fitness for evolution
     
+    def weight_vector(self) -> List[float]:
+        return [self.weights[name] for name in GENE_NAMES]
+    
+    def feature_transform(self) -> Tuple[List[float], List[float], float]:
+        """(scales, offsets, tail score of a one-cell snake) turning raw move
+        features into the calculate_move_score terms"""
+        size = self.grid_size
+        return [-1 / (size * 2), 1 / size, 1 / (size * 2), 1 / 4], [0.0, 0.0, 0.0, 0.0], 1.0
+    
+    def normalized_features(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int],
+                            snake_body: List[Tuple[int, int]]) -> Tuple[List[List[float]], List[bool]]:
+        """Move score terms, before weighting, for all four candidates"""
+        features, valid = move_features(snake_head, food_pos, snake_body, self.grid_size)
+        return normalize_features(features, *self.feature_transform()), valid
+    
+    batch_native = True
+    
+    def get_next_moves(self, heads: np.ndarray, foods: np.ndarray, occupancy: np.ndarray,
+                       bodies=None) -> np.ndarray:
+        """Score the candidates of every game with one batched dot product"""
+        return batch_best_moves(heads, foods, occupancy, self.feature_transform(), self.weight_vector())
+    
     def calculate_move_score(self, pos: Tuple[int, int], snake_head: Tuple[int, int], 
                            food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> float:
         """Calculate a score for a potential move based on weighted factors"""
@@ -55,31 +235,29 @@ class GeneticAI(BaseAI):
     
     def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], 
                      snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
-        # Get valid neighboring positions
-        neighbors = self.get_valid_neighbors(snake_head, snake_body)
+        # Score all four candidate moves at once
+        features, valid = self.normalized_features(snake_head, food_pos, snake_body)
         
-        if not neighbors:
+        if not any(valid):
             return (0, 0)  # No valid moves
         
-        # Score each possible move
-        move_scores = []
-        for pos in neighbors:
-            score = self.calculate_move_score(pos, snake_head, food_pos, snake_body)
-            move_scores.append((score, pos))
-        
         # Choose the best move
-        best_score, best_pos = max(move_scores)
+        move, best_pos = best_move(snake_head, features, valid, self.weight_vector())
         
         # Update current_path for visualization
         self.current_path = [best_pos]
         
-        # Return direction to move
-        return (best_pos[0] - snake_head[0], best_pos[1] - snake_head[1])
+        return move
+    
+    @staticmethod
+    def game_fitness(score: int, moves: int) -> int:
+        """Fitness of one game"""
+        # Fitness considers both score and efficiency
+        return score * 100 + moves
     
     def update_fitness(self, score: int, moves: int):
         """Update fitness based on game performance"""
-        # Fitness considers both score and efficiency
-        self.fitness = score * 100 + moves
+        self.fitness = self.game_fitness(score, moves)
     
     @staticmethod
     def crossover(parent1: 'GeneticAI', parent2: 'GeneticAI') -> 'GeneticAI':
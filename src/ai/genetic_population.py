@@ -1,6 +1,7 @@
 import random
-from typing import List, Dict, Tuple
-from .genetic import GeneticAI
+from typing import List, Dict, Tuple, Optional
+import numpy as np
+from .genetic import GeneticAI, GENE_NAMES, move_features, best_move, normalize_features, batch_best_moves
 from src.ai.base import BaseAI
 
 class GeneticIndividual(BaseAI):
@@ -17,6 +18,28 @@ class GeneticIndividual(BaseAI):
         self.fitness = 0
         self.current_path = []  # For visualization
     
+    def weight_vector(self) -> List[float]:
+        return [self.weights[name] for name in GENE_NAMES]
+    
+    def feature_transform(self) -> Tuple[List[float], List[float], float]:
+        """(scales, offsets, tail feature of a one-cell snake) turning raw
+        move features into calculate_features values"""
+        size = self.grid_size
+        return [-1 / (size * 2), 1 / (size / 2), 1 / size, 1 / 4], [1.0, 0.0, 0.0, 0.0], 1.0
+    
+    def normalized_features(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int],
+                            snake_body: List[Tuple[int, int]]) -> Tuple[List[List[float]], List[bool]]:
+        """calculate_features for all four candidate moves in one pass"""
+        features, valid = move_features(snake_head, food_pos, snake_body, self.grid_size)
+        return normalize_features(features, *self.feature_transform()), valid
+    
+    batch_native = True
+    
+    def get_next_moves(self, heads: np.ndarray, foods: np.ndarray, occupancy: np.ndarray,
+                       bodies=None) -> np.ndarray:
+        """Score the candidates of every game with one batched dot product"""
+        return batch_best_moves(heads, foods, occupancy, self.feature_transform(), self.weight_vector())
+    
     def calculate_features(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], 
                          snake_body: List[Tuple[int, int]]) -> Dict[str, float]:
         """Calculate input features for decision making"""
@@ -53,34 +76,16 @@ class GeneticIndividual(BaseAI):
     def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], 
                       snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
         """Decide next move based on current state and learned weights"""
-        # Get all possible moves
-        possible_moves = []
-        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            new_pos = (snake_head[0] + dx, snake_head[1] + dy)
-            if new_pos not in snake_body and 0 <= new_pos[0] < self.grid_size and 0 <= new_pos[1] < self.grid_size:
-                possible_moves.append((dx, dy, new_pos))
+        # Features of all four candidate moves
+        features, valid = self.normalized_features(snake_head, food_pos, snake_body)
         
-        if not possible_moves:
+        if not any(valid):
             return (0, 0)
         
-        # Evaluate each move
-        best_move = None
-        best_score = float('-inf')
-        
-        for dx, dy, new_pos in possible_moves:
-            # Calculate features for this move
-            features = self.calculate_features(new_pos, food_pos, snake_body)
-            
-            # Calculate weighted sum
-            score = sum(self.weights[feature] * value 
-                       for feature, value in features.items())
-            
-            if score > best_score:
-                best_score = score
-                best_move = (dx, dy)
-                self.current_path = [new_pos]  # Update visualization path
-        
-        return best_move or (0, 0)
+        # Weighted sum of every candidate is one dot product
+        move, new_pos = best_move(snake_head, features, valid, self.weight_vector())
+        self.current_path = [new_pos]  # Update visualization path
+        return move
     
     def update_fitness(self, score: int, moves: int):
         """Update individual's fitness based on game performance"""
@@ -90,10 +95,22 @@ class GeneticIndividual(BaseAI):
             self.fitness = 0
 
 class GeneticPopulation:
-    def __init__(self, population_size: int = 50):
+    """Population of GeneticAI weight vectors.
+
+    Individuals are rows of an (individuals x genes) matrix in GENE_NAMES
+    order with a matching fitness vector, so evolution is a handful of
+    array operations. GeneticAI objects are only built to play or save.
+    """
+    
+    def __init__(self, population_size: int = 50, mutation_rate: float = 0.1,
+                 mutation_size: float = 0.2):
         self.population_size = population_size
+        self.mutation_rate = mutation_rate  # Chance of mutating each gene of a child
+        self.mutation_size = mutation_size  # Largest mutation step
         self.generation = 0
-        self.population: List[GeneticAI] = []
+        self.rng = np.random.default_rng(random.getrandbits(64))
+        self.genes = np.zeros((0, len(GENE_NAMES)))
+        self.fitness = np.zeros(0)
         self.best_individual: GeneticAI = None
         self.best_fitness = 0
         self.generation_stats: List[Dict] = []
@@ -103,63 +120,92 @@ class GeneticPopulation:
     
     def initialize_population(self):
         """Create initial population with random weights"""
-        self.population = [GeneticAI() for _ in range(self.population_size)]
+        self.genes = self.rng.uniform(-1, 1, (self.population_size, len(GENE_NAMES)))
+        self.fitness = np.zeros(self.population_size)
+    
+    def individual(self, index: int) -> GeneticAI:
+        """A playable GeneticAI for one row of the population"""
+        ai = GeneticAI(weights=dict(zip(GENE_NAMES, self.genes[index].tolist())))
+        ai.fitness = self.fitness[index].item()
+        return ai
+    
+    @property
+    def population(self) -> List[GeneticAI]:
+        """Every individual as a GeneticAI; these are copies, so fitness
+        goes back through update_fitness"""
+        return [self.individual(i) for i in range(len(self.genes))]
+    
+    def update_fitness(self, index: int, score: int, moves: int):
+        """Record the game result of one individual"""
+        self.fitness[index] = GeneticAI.game_fitness(score, moves)
+    
+    def set_fitness(self, index: int, fitness: float):
+        """Set one individual's fitness, e.g. averaged over several games"""
+        self.fitness[index] = fitness
     
     def evolve(self):
         """Evolve the population to create the next generation"""
-        # Sort population by fitness
-        self.population.sort(key=lambda x: x.fitness, reverse=True)
+        # Sort population by fitness, best first (stable, so ties keep their order)
+        order = np.argsort(-self.fitness, kind="stable")
+        genes, fitness = self.genes[order], self.fitness[order]
         
         # Update best individual
-        if self.population[0].fitness > self.best_fitness:
-            self.best_fitness = self.population[0].fitness
-            self.best_individual = GeneticAI(weights=self.population[0].weights.copy())
+        if fitness[0] > self.best_fitness:
+            self.best_fitness = fitness[0].item()
+            self.best_individual = GeneticAI(weights=dict(zip(GENE_NAMES, genes[0].tolist())))
         
         # Record generation statistics
         self.generation_stats.append({
             'generation': self.generation,
-            'best_fitness': self.population[0].fitness,
-            'avg_fitness': sum(x.fitness for x in self.population) / len(self.population)
+            'best_fitness': fitness[0].item(),
+            'avg_fitness': fitness.mean().item()
         })
         
-        # Select top performers (top 20%)
+        # Keep the top performers (top 20%) as they are
         elite_size = max(2, self.population_size // 5)
-        elite = self.population[:elite_size]
+        children = self.population_size - elite_size
         
-        # Create new population
-        new_population = []
+        # Tournament selection: rows are sorted, so the lowest index drawn wins
+        parents = self.tournament_select(size=(2, children))
         
-        # Keep elite individuals
-        new_population.extend(GeneticAI(weights=x.weights.copy()) for x in elite)
+        # Uniform crossover, then small random mutations clamped to [-1, 1]
+        shape = (children, len(GENE_NAMES))
+        offspring = np.where(self.rng.random(shape) < 0.5, genes[parents[0]], genes[parents[1]])
+        mutated = self.rng.random(shape) < self.mutation_rate
+        offspring += mutated * self.rng.uniform(-self.mutation_size, self.mutation_size, shape)
+        np.clip(offspring, -1, 1, out=offspring)
         
-        # Fill rest with children
-        while len(new_population) < self.population_size:
-            # Select parents (tournament selection)
-            parent1 = self.tournament_select()
-            parent2 = self.tournament_select()
-            
-            # Create child
-            child = GeneticAI.crossover(parent1, parent2)
-            new_population.append(child)
-        
-        self.population = new_population
+        self.genes = np.vstack((genes[:elite_size], offspring))
+        self.fitness = np.zeros(len(self.genes))
         self.generation += 1
     
-    def tournament_select(self, tournament_size: int = 3) -> GeneticAI:
-        """Select an individual using tournament selection"""
-        tournament = random.sample(self.population, tournament_size)
-        return max(tournament, key=lambda x: x.fitness)
+    def emigrants(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Copies of the genes and fitness of the count fittest individuals"""
+        best = np.argsort(-self.fitness, kind="stable")[:count]
+        return self.genes[best].copy(), self.fitness[best].copy()
+    
+    def immigrate(self, genes: np.ndarray, fitness: np.ndarray):
+        """Replace the least fit individuals with arrivals from another population"""
+        worst = np.argsort(self.fitness, kind="stable")[:len(genes)]
+        self.genes[worst] = genes[:len(worst)]
+        self.fitness[worst] = fitness[:len(worst)]
+    
+    def tournament_select(self, tournament_size: int = 3, size: Optional[Tuple[int, ...]] = None):
+        """Row indices of tournament winners, for a population sorted best
+        first; size gives the shape of the result (one index by default)"""
+        draws = self.rng.integers(0, len(self.genes), (size or ()) + (tournament_size,))
+        return draws.min(axis=-1)
     
     def get_current_individual(self) -> GeneticAI:
         """Get the current individual being evaluated"""
-        if not self.population:
+        if not len(self.genes):
             self.initialize_population()
-        return self.population[0]
+        return self.individual(0)
     
     def update_current_fitness(self, score: int, moves: int):
         """Update the fitness of the current individual"""
-        if self.population:
-            self.population[0].update_fitness(score, moves)
+        if len(self.genes):
+            self.update_fitness(0, score, moves)
     
     def get_generation_info(self) -> Dict:
         """Get information about the current generation"""
@@ -167,5 +213,5 @@ class GeneticPopulation:
             'generation': self.generation,
             'population_size': self.population_size,
             'best_fitness_ever': self.best_fitness,
-            'current_best_fitness': max(x.fitness for x in self.population) if self.population else 0
-        } 
\ No newline at end of file
+            'current_best_fitness': self.fitness.max().item() if len(self.fitness) else 0
+        }
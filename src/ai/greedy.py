@@ -1,8 +1,27 @@
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 import heapq
-from .base import BaseAI
+import numpy as np
+from .base import BATCH_OFFSETS, BaseAI, batch_candidates, moves_from_choice
+
+_batch_tables: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+def batch_tables(grid_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Each cell's neighbour cells in BATCH_OFFSETS order (-1 off the
+    board), shape (area, 4), and its place in heap order, which compares
+    positions (x, y) as tuples; shared per board size"""
+    tables = _batch_tables.get(grid_size)
+    if tables is None:
+        cells = np.arange(grid_size * grid_size)
+        x, y = cells % grid_size, cells // grid_size
+        nx, ny = x[:, None] + BATCH_OFFSETS[:, 0], y[:, None] + BATCH_OFFSETS[:, 1]
+        on_board = (nx >= 0) & (nx < grid_size) & (ny >= 0) & (ny < grid_size)
+        tables = (np.where(on_board, ny * grid_size + nx, -1), x * grid_size + y)
+        _batch_tables[grid_size] = tables
+    return tables
 
 class GreedyBestFirstAI(BaseAI):
+    batch_native = True
+
     def __init__(self):
         super().__init__()
         self.name = "Greedy Best-First"
@@ -16,12 +35,17 @@ class GreedyBestFirstAI(BaseAI):
         # Priority queue of (distance, position, path)
         queue = [(self.manhattan_distance(start, goal), start, [])]
         visited = {start}
+        closest, closest_dist = [], self.manhattan_distance(start, goal)
         
         while queue:
-            _, current, path = heapq.heappop(queue)
+            dist, current, path = heapq.heappop(queue)
             
             if current == goal:
                 return path + [current]
+            if self.budget.exhausted():
+                return closest  # Best path so far
+            if dist < closest_dist:
+                closest, closest_dist = path + [current], dist
             
             # Get valid neighbors
             neighbors = self.get_valid_neighbors(current, snake_body)
@@ -56,4 +80,89 @@ class GreedyBestFirstAI(BaseAI):
             self.current_path = [next_pos]
             return (next_pos[0] - snake_head[0], next_pos[1] - snake_head[1])
         
-        return (0, 0)  # No valid moves 
\ No newline at end of file
+        return (0, 0)  # No valid moves
+
+    def get_next_moves(self, heads: np.ndarray, foods: np.ndarray, occupancy: np.ndarray,
+                       bodies=None) -> np.ndarray:
+        """get_next_move for every game at once, without a move budget.
+
+        The best-first searches run in lockstep: each round pops the
+        queued cell with the smallest (distance, x, y) of every unfinished
+        game, as heapq does, and queues its unseen free neighbours. A
+        cell's first step is fixed when it is queued, so a game is done
+        as soon as its food is queued. Games without a path take the free
+        neighbour closest to the food.
+        """
+        num_games, size = len(heads), occupancy.shape[1]
+        area = size * size
+        neighbors, heap_order = batch_tables(size)
+        # Flat (game * area + cell) arrays, so every lookup is one fancy index
+        free = ~occupancy.reshape(-1)
+        rows = np.arange(num_games) * area
+        starts = heads[:, 1] * size + heads[:, 0]
+        food_x, food_y = foods[:, 0], foods[:, 1]
+        has_food = (food_x >= 0) & (food_x < size) & (food_y >= 0) & (food_y < size)
+        goals = np.where(has_food, food_y * size + food_x, -1)
+        cells = np.arange(area)
+        keys = ((np.abs(cells % size - food_x[:, None]) + np.abs(cells // size - food_y[:, None]))
+                * area + heap_order).reshape(-1)  # Heap order: (distance, x, y)
+        empty = np.iinfo(keys.dtype).max
+        queue = np.full(num_games * area, empty, dtype=keys.dtype)  # Key of each queued cell
+        seen = np.zeros(num_games * area, dtype=bool)
+        seen[rows + starts] = True
+        first = np.zeros(num_games * area, dtype=np.int64)  # BATCH_OFFSETS index of the first step
+        found = np.full(num_games, -1)
+
+        def expand(games: np.ndarray, cell: np.ndarray, from_start: bool) -> None:
+            n = neighbors[cell]
+            index = np.where(n >= 0, rows[games, None] + n, 0)
+            new = (n >= 0) & free[index] & ~seen[index]
+            game, direction = np.nonzero(new)
+            index = index[game, direction]
+            seen[index] = True
+            queue[index] = keys[index]
+            first[index] = direction if from_start else first[rows[games[game]] + cell[game]]
+            reached = n[game, direction] == goals[games[game]]
+            found[games[game[reached]]] = first[index[reached]]
+
+        expand(np.arange(num_games), starts, True)
+        active = np.flatnonzero(has_food & (found < 0))
+        while len(active):
+            cell = queue.reshape(num_games, area)[active].argmin(axis=1)
+            live = queue[rows[active] + cell] != empty  # A game whose queue ran dry has no path
+            active, cell = active[live], cell[live]
+            queue[rows[active] + cell] = empty
+            expand(active, cell, False)
+            active = active[found[active] < 0]
+
+        candidates, valid = batch_candidates(heads, occupancy)
+        step_distances = np.abs(candidates - foods[:, None, :]).sum(axis=2)
+        closest = np.argmin(np.where(valid, step_distances, np.iinfo(step_distances.dtype).max), axis=1)
+        self.current_path = []
+        return moves_from_choice(np.where(found >= 0, found, closest), valid | (found >= 0)[:, None])
+
+class SafeGreedyAI(BaseAI):
+    """One greedy step with a safety veto: the closest neighbor to the
+    food whose move still lets the head reach the tail, else the one
+    leaving the most room. One flood fill per candidate, no path search,
+    and no state between moves, so it can take over any position mid-game
+    (it is the live game's fallback when the chosen AI is too slow)."""
+
+    def __init__(self):
+        super().__init__()
+        self.name = "Safe Greedy"
+        self.description = "Steps towards the food unless that cuts it off from its tail"
+        self.current_path = []
+
+    def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
+        neighbors = self.get_valid_neighbors(snake_head, snake_body)
+        if not neighbors:
+            return (0, 0)  # No valid moves
+        neighbors.sort(key=lambda pos: abs(pos[0] - food_pos[0]) + abs(pos[1] - food_pos[1]))
+        context = self.context.at(snake_body)
+        next_pos = next((pos for pos in neighbors
+                         if context.tail_reachable_after(pos, self.budget)), None)
+        if next_pos is None:
+            next_pos = max(neighbors, key=lambda pos: context.reachable_after(pos, self.budget))
+        self.current_path = [next_pos]
+        return (next_pos[0] - snake_head[0], next_pos[1] - snake_head[1])
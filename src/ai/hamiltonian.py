@@ -1,6 +1,7 @@
 from typing import List, Tuple
 from src.utils.settings import GRID_SIZE
 from .base import BaseAI
+from .virtual_snake import serpentine_cycle
 
 class HamiltonianWithShortcutsAI(BaseAI):
     def __init__(self):
@@ -11,27 +12,28 @@ class HamiltonianWithShortcutsAI(BaseAI):
         self.current_path = []
     
     def _generate_cycle(self):
-        """Generate a simple Hamiltonian cycle for the grid"""
-        self.cycle = []
-        # Start from top-left, go right, then snake down
-        for y in range(GRID_SIZE):
-            row = range(GRID_SIZE) if y % 2 == 0 else range(GRID_SIZE-1, -1, -1)
-            for x in row:
-                self.cycle.append((x, y))
-        # Connect back to start
-        self.cycle.append((0, 0))
+        """Look up the simple Hamiltonian cycle for the grid"""
+        self.cycle, self.cycle_index = serpentine_cycle(GRID_SIZE)
     
     def _find_shortcut(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
-        """Try to find a safe shortcut to the food"""
-        current_idx = self.cycle.index(snake_head)
-        food_idx = self.cycle.index(food_pos)
+        """Try to find a safe shortcut to the food, once per square and food
+        through the move context (the look-ahead starts where the move does)"""
+        return self.context.at(snake_body).memo(
+            'hamiltonian_shortcut', (snake_head, food_pos),
+            lambda: self._shortcut_from(snake_head, food_pos))
+    
+    def _shortcut_from(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int]) -> Tuple[int, int]:
+        current_idx = self.cycle_index[snake_head]
+        food_idx = self.cycle_index[food_pos]
         
-        # Check if we can safely move directly towards food
-        neighbors = self.get_valid_neighbors(snake_head, snake_body)
-        for next_pos in neighbors:
-            if next_pos not in self.cycle:
+        # Check if we can safely move directly towards food, reading the
+        # body off the context's occupancy rather than searching the list
+        snake = self.context.loaded()
+        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+            next_pos = (snake_head[0] + dx, snake_head[1] + dy)
+            if not snake.in_bounds(next_pos) or snake.occupied[snake.cell_of(next_pos)]:
                 continue
-            next_idx = self.cycle.index(next_pos)
+            next_idx = self.cycle_index[next_pos]
             
             # Only take shortcut if it's safe and gets us closer to food
             if (food_idx > current_idx and next_idx > current_idx) or \
@@ -44,7 +46,7 @@ class HamiltonianWithShortcutsAI(BaseAI):
 
     def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
         # Update current path for visualization
-        current_idx = self.cycle.index(snake_head)
+        current_idx = self.cycle_index[snake_head]
         self.current_path = []
         
         # Only take shortcuts when snake is small enough
@@ -1,9 +1,9 @@
 from src.ai.base import BaseAI
 from src.ai.astar import AStarAI
 from src.ai.hamiltonian import HamiltonianWithShortcutsAI
+from src.ai.virtual_snake import VirtualSnake
 from typing import Tuple, List, Optional, Set, Dict
 from src.utils.settings import GRID_SIZE
-from collections import deque
 
 class SmartHybridAI(BaseAI):
     def __init__(self):
@@ -12,68 +12,75 @@ class SmartHybridAI(BaseAI):
         self.description = "Advanced hybrid of A* and Hamiltonian with optimized performance"
         self.astar = AStarAI()
         self.hamiltonian = HamiltonianWithShortcutsAI()
+        self.share_budget(self.astar, self.hamiltonian)
         self.current_strategy = "astar"
         self.grid_size = GRID_SIZE
         self.safety_margin = 2
-        self.space_score_cache: Dict[Tuple[Tuple[int, int], Tuple[Tuple[int, int], ...]], float] = {}
+    
+    def reset(self, board=None) -> None:
+        super().reset(board)
+        self.current_strategy = "astar"
         
     def calculate_space_score(self, pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> float:
-        """Calculate available space score with flood fill and caching"""
-        # Convert snake_body to tuple for hashing
-        cache_key = (pos, tuple(snake_body))
-        if cache_key in self.space_score_cache:
-            return self.space_score_cache[cache_key]
-            
-        visited = {pos}
-        queue = deque([pos])
+        """Calculate available space score with a depth-limited flood fill,
+        once per position through the move context"""
+        context = self.context.at(snake_body)
+        return context.memo('space_score', pos, lambda: self.space_score_from(
+            context.loaded(), context.loaded().cell_of(pos)))
+    
+    def calculate_virtual_space_score(self, snake: VirtualSnake) -> float:
+        """Same depth-limited flood fill as calculate_space_score, from the
+        head of a simulated snake"""
+        return self.space_score_from(snake, snake.head_cell)
+    
+    def space_score_from(self, snake: VirtualSnake, start: int) -> float:
+        """Free cells within 4 moves of start, each weighted by 1 / distance"""
+        occupied, neighbors = snake.occupied, snake.neighbors
+        visited = {start}
+        level = [start]
         space_score = 0
-        depth = 0
-        max_depth = 4  # Reduced depth for performance
         
-        while queue and depth < max_depth:
-            level_size = len(queue)
-            depth += 1
-            
-            for _ in range(level_size):
-                current = queue.popleft()
-                neighbors = self.get_valid_neighbors(current, snake_body)
-                
-                for neighbor in neighbors:
-                    if neighbor not in visited:
-                        visited.add(neighbor)
-                        queue.append(neighbor)
+        for depth in range(1, 5):  # Reduced depth for performance
+            next_level = []
+            for cell in level:
+                for n in neighbors[cell]:
+                    if n not in visited and not occupied[n]:
+                        visited.add(n)
+                        next_level.append(n)
                         space_score += 1.0 / depth
-        
-        self.space_score_cache[cache_key] = space_score
-        if len(self.space_score_cache) > 1000:  # Prevent memory bloat
-            self.space_score_cache.clear()
+            level = next_level
         return space_score
     
     def validate_path(self, path: List[Tuple[int, int]], snake_body: List[Tuple[int, int]]) -> bool:
-        """Validate path safety with optimized checks"""
+        """Validate path safety: follow the path on a simulated snake, check
+        escape routes near the start and tail reachability at the end"""
         if not path:
             return False
             
-        temp_body = snake_body.copy()
-        
-        # Only check first few positions for performance
-        check_positions = path[:4]  # Reduced from checking entire path
+        snake = self.context.at(snake_body).loaded()  # Rewound below
+        safe = True
         
-        for pos in check_positions:
-            # Update snake body
-            temp_body = temp_body[1:] + [pos]
+        for step, pos in enumerate(path):
+            if not snake.advance(pos):
+                safe = False
+                break
             
-            # Quick neighbor check first (faster than space score)
-            neighbors = self.get_valid_neighbors(pos, temp_body)
-            if len(neighbors) < 2:  # Need at least 2 escape routes
-                return False
-            
-            # Only calculate space score if we pass neighbor check
-            space_score = self.calculate_space_score(pos, temp_body)
-            if space_score < 4:  # Slightly reduced threshold for performance
-                return False
+            # Only check escape routes for the first few positions
+            if step < 4:
+                # Quick neighbor check first (faster than space score)
+                if snake.free_neighbors(snake.head_cell) < 2:  # Need at least 2 escape routes
+                    safe = False
+                    break
+                
+                # Only calculate space score if we pass neighbor check
+                if self.calculate_virtual_space_score(snake) < 4:
+                    safe = False
+                    break
         
-        return True
+        if safe:
+            safe = snake.can_reach_tail(self.budget)
+        snake.rewind()
+        return safe
     
     def should_use_astar(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], 
                         snake_body: List[Tuple[int, int]], astar_path: List[Tuple[int, int]]) -> bool:
@@ -117,6 +124,16 @@ class SmartHybridAI(BaseAI):
             self.current_strategy = "hamiltonian"
             move = self.hamiltonian.get_next_move(snake_head, food_pos, snake_body)
             self.current_path = self.hamiltonian.current_path
+            if self.budget.truncated and astar_path and move != astar_move:
+                # A* was turned down without its path being checked to the end:
+                # keep it unless the cycle's move has more room counted so far
+                context = self.context.at(snake_body)
+                astar_room = context.reachable_after(astar_path[0], self.budget)
+                cycle_room = context.reachable_after((snake_head[0] + move[0], snake_head[1] + move[1]), self.budget)
+                if astar_room >= cycle_room and astar_room > 0:
+                    self.current_strategy = "astar"
+                    self.current_path = astar_path
+                    return astar_move
             return move
 
 # Create an alias for backward compatibility
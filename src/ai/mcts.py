@@ -0,0 +1,254 @@
+from typing import List, Tuple, Dict, Optional
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from .base import BaseAI, MoveBudget
+from .virtual_snake import VirtualSnake
+from src.utils.settings import GRID_SIZE
+
+EAT_REWARD = 1.0
+DEATH_REWARD = -1.0
+SPAWN_MIN_DISTANCE = 3  # Food.spawn prefers cells further than this from the head
+
+class _Node:
+    __slots__ = ("visits", "value", "children", "untried")
+
+    def __init__(self, moves: List[int]):
+        self.visits = 0
+        self.value = 0.0
+        self.children: Dict[int, '_Node'] = {}
+        self.untried = moves
+
+class TreeSearch:
+    """Single-threaded UCT search from one root position.
+
+    Every simulated step is an advance() on a VirtualSnake and gets undone
+    when the iteration ends, so selection, expansion and rollouts share one
+    copy of the state instead of copying the body.
+    """
+
+    def __init__(self, snake_body: List[Tuple[int, int]], food_pos: Tuple[int, int],
+                 grid_size: int = GRID_SIZE, exploration: float = 1.4,
+                 rollout_depth: int = 40, greedy_rollouts: bool = True, seed: Optional[int] = None):
+        self.snake = VirtualSnake(snake_body, grid_size)
+        self.grid_size = grid_size
+        self.food = self.snake.cell_of(food_pos) if self.snake.in_bounds(food_pos) else -1
+        self.exploration = exploration
+        self.rollout_depth = rollout_depth
+        self.greedy_rollouts = greedy_rollouts
+        self.rng = random.Random(seed)
+        self.root = _Node(self.legal_moves())
+        self.iterations = 0
+
+    def legal_moves(self) -> List[int]:
+        snake = self.snake
+        occupied = snake.occupied
+        return [n for n in snake.neighbors[snake.head_cell] if not occupied[n]]
+
+    def distance(self, cell1: int, cell2: int) -> int:
+        size = self.grid_size
+        return abs(cell1 % size - cell2 % size) + abs(cell1 // size - cell2 // size)
+
+    def spawn_food(self) -> int:
+        """Place food like Food.spawn, by rejection sampling"""
+        snake = self.snake
+        occupied, head = snake.occupied, snake.head_cell
+        fallback = -1
+        for _ in range(64):
+            cell = self.rng.randrange(snake.area)
+            if not occupied[cell]:
+                if self.distance(cell, head) > SPAWN_MIN_DISTANCE:
+                    return cell
+                fallback = cell
+        return fallback
+
+    def step(self, cell: int, food: int) -> Tuple[bool, float, int]:
+        """Advance onto cell; returns (moved, reward, food cell afterwards).
+        A cell stored in the tree can be taken by the body on a later
+        iteration, since respawned food changes where the snake grew, so
+        moved is False (and nothing changes) when the snake can't enter it."""
+        eats = cell == food
+        if not self.snake.advance_cell(cell, eat=eats):
+            return False, 0.0, food
+        if eats:
+            return True, EAT_REWARD, self.spawn_food()
+        return True, 0.0, food
+
+    def rollout(self, food: int, steps_taken: List[int]) -> float:
+        """Play a fast greedy (or random) safe policy from the current state"""
+        reward, discount = 0.0, 1.0
+        for _ in range(self.rollout_depth):
+            moves = self.legal_moves()
+            if not moves:
+                return reward + discount * DEATH_REWARD
+            if self.greedy_rollouts and food >= 0 and self.rng.random() < 0.8:
+                cell = min(moves, key=lambda m: self.distance(m, food))
+            else:
+                cell = self.rng.choice(moves)
+            moved, step_reward, food = self.step(cell, food)
+            if not moved:
+                return reward + discount * DEATH_REWARD
+            steps_taken[0] += 1
+            discount *= 0.95
+            reward += discount * step_reward
+            if food < 0:
+                break  # Board full
+        return reward
+
+    def iterate(self) -> None:
+        """One selection / expansion / rollout / backpropagation pass"""
+        node, food = self.root, self.food
+        path = [node]
+        steps = [0]
+        reward = 0.0
+        dead = False  # A move along the tree ran into the body
+
+        # Selection
+        while not node.untried and node.children:
+            log_visits = math.log(node.visits)
+            cell, node = max(
+                node.children.items(),
+                key=lambda item: item[1].value / item[1].visits +
+                                 self.exploration * math.sqrt(log_visits / item[1].visits)
+            )
+            path.append(node)
+            moved, step_reward, food = self.step(cell, food)
+            if not moved:
+                dead = True
+                break
+            steps[0] += 1
+            reward += step_reward
+
+        # Expansion
+        if not dead and node.untried:
+            cell = node.untried.pop(self.rng.randrange(len(node.untried)))
+            moved, step_reward, food = self.step(cell, food)
+            if moved:
+                steps[0] += 1
+                reward += step_reward
+                child = _Node(self.legal_moves())
+            else:
+                dead = True
+                child = _Node([])
+            node.children[cell] = child
+            path.append(child)
+            node = child
+
+        # Simulation
+        if dead or (not node.untried and not node.children):
+            reward += DEATH_REWARD  # Terminal: collided, or no legal move
+        else:
+            reward += self.rollout(food, steps)
+
+        # Unmake every simulated step
+        self.snake.rewind(steps[0])
+
+        # Backpropagation
+        for visited in path:
+            visited.visits += 1
+            visited.value += reward
+        self.iterations += 1
+
+    def run(self, time_limit: float, budget=None) -> Dict[int, Tuple[int, float]]:
+        """Search until time_limit seconds pass or the move budget runs out,
+        counting one node per iteration; returns root move statistics. At
+        least one iteration runs, so a legal move always gets a visit."""
+        deadline = time.perf_counter() + time_limit
+        while self.root.untried or self.root.children:
+            self.iterate()
+            if time.perf_counter() >= deadline or (budget is not None and budget.exhausted()):
+                break
+        return {cell: (child.visits, child.value) for cell, child in self.root.children.items()}
+
+def _search_worker(snake_body, food_pos, grid_size, time_limit, max_iterations, exploration, rollout_depth, seed):
+    """Run an independent tree in a worker process (root parallelization)"""
+    search = TreeSearch(snake_body, food_pos, grid_size, exploration, rollout_depth, seed=seed)
+    budget = MoveBudget(max_nodes=max_iterations) if max_iterations is not None else None
+    if budget is not None:
+        budget.start()
+    stats = search.run(time_limit, budget)
+    return stats, search.iterations
+
+class MCTSAI(BaseAI):
+    deterministic = False  # Random rollouts
+
+    def __init__(self, time_limit: float = 0.05, workers: int = 1,
+                 exploration: float = 1.4, rollout_depth: int = 40):
+        super().__init__()
+        self.name = "Monte Carlo Tree Search"
+        self.description = "UCT search with greedy rollouts, optionally parallelized across cores"
+        self.current_path = []
+        self.time_limit = time_limit  # Seconds per move unless the move budget sets one
+        # Worker processes for root parallelization, 0 for one per core. One
+        # searches in-process: a pool only pays off with cores to spare
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.exploration = exploration
+        self.rollout_depth = rollout_depth
+        self.iterations = 0              # Iterations summed over workers, last move
+        self.iterations_per_second = 0.0
+        self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def close(self) -> None:
+        """Shut down the worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def reset(self, board=None) -> None:
+        """Also shuts down the worker pool; the next move starts a new one"""
+        super().reset(board)
+        self.close()
+
+    def search(self, food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]], time_limit: float) -> Dict[int, Tuple[int, float]]:
+        """Merged root statistics from all workers: move cell -> (visits, value)"""
+        if self.workers <= 1:
+            search = TreeSearch(snake_body, food_pos, self.grid_size, self.exploration, self.rollout_depth)
+            stats = search.run(time_limit, self.budget)
+            self.iterations = search.iterations
+            return stats
+
+        # Workers can't draw on this process's budget, so each gets the
+        # time left and an equal share of the node allowance
+        max_nodes = self.budget.max_nodes
+        max_iterations = max(1, max_nodes // self.workers) if max_nodes is not None else None
+        body = list(snake_body)
+        pool = self._get_pool()
+        futures = [
+            pool.submit(_search_worker, body, food_pos, self.grid_size, time_limit, max_iterations,
+                        self.exploration, self.rollout_depth, random.getrandbits(32))
+            for _ in range(self.workers)
+        ]
+        merged: Dict[int, Tuple[int, float]] = {}
+        self.iterations = 0
+        for future in futures:
+            stats, iterations = future.result()
+            self.iterations += iterations
+            for cell, (visits, value) in stats.items():
+                total_visits, total_value = merged.get(cell, (0, 0.0))
+                merged[cell] = (total_visits + visits, total_value + value)
+        return merged
+
+    def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
+        start = time.perf_counter()
+        deadline = self.budget.deadline
+        time_limit = max(0.0, deadline - start) if deadline is not None else self.time_limit
+        stats = self.search(food_pos, snake_body, time_limit)
+        elapsed = time.perf_counter() - start
+        self.iterations_per_second = self.iterations / elapsed if elapsed > 0 else 0.0
+
+        if not stats:
+            self.current_path = []
+            return (0, 0)
+
+        # Most visited root move is the robust choice
+        best = max(stats, key=lambda cell: stats[cell][0])
+        next_pos = (best % self.grid_size, best // self.grid_size)
+        self.current_path = [next_pos]
+        return (next_pos[0] - snake_head[0], next_pos[1] - snake_head[1])
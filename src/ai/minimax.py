@@ -1 +1,210 @@
- 
\ No newline at end of file
+from typing import List, Tuple, Dict, Optional
+import random
+import time
+from .base import BaseAI
+from .virtual_snake import VirtualSnake
+
+_position_key_tables: Dict[int, Tuple[List[int], List[int], List[int], int]] = {}
+
+def position_keys(grid_size: int) -> Tuple[List[int], List[int], List[int], int]:
+    """Zobrist keys for the head cell, the tail cell, the food cell (index
+    food + 1, so no food is index 0) and a pending growth, which together
+    with VirtualSnake.hash over the occupancy key a search position;
+    shared per board size"""
+    keys = _position_key_tables.get(grid_size)
+    if keys is None:
+        rng = random.Random(f"position keys {grid_size}")  # Fixed, and apart from the occupancy keys
+        area = grid_size * grid_size
+        keys = ([rng.getrandbits(64) for _ in range(area)],
+                [rng.getrandbits(64) for _ in range(area)],
+                [rng.getrandbits(64) for _ in range(area + 1)],
+                rng.getrandbits(64))
+        _position_key_tables[grid_size] = keys
+    return keys
+
+class _SearchTimeout(Exception):
+    """Raised inside the search when the per-move time budget runs out"""
+
+class ExpectimaxAI(BaseAI):
+    EAT_REWARD = 100.0
+    DEATH_PENALTY = -1000.0
+    TRAP_PENALTY = -500.0    # Root move after which the head can't reach the tail
+    SPAWN_MIN_DISTANCE = 3   # Food.spawn prefers cells further than this from the head
+    deterministic = False    # Samples food spawns
+
+    def __init__(self, max_depth: int = 6, time_limit: float = 0.03, food_samples: int = 3):
+        super().__init__()
+        self.name = "Expectimax"
+        self.description = "Searches moves and food spawns with iterative deepening"
+        self.current_path = []
+        self.max_depth = max_depth
+        self.time_limit = time_limit      # Seconds per move unless the move budget sets one
+        self.food_samples = food_samples  # Spawn locations averaged at each chance node
+        self.virtual_snake = VirtualSnake(grid_size=self.grid_size)
+        self.head_keys, self.tail_keys, self.food_keys, self.pending_key = position_keys(self.grid_size)
+        self.rng = random.Random()
+        # position_key -> (depth searched, value, best move cell)
+        self.transpositions: Dict[int, Tuple[int, float, int]] = {}
+        self.nodes = 0
+        self.completed_depth = 0
+        self._deadline = 0.0
+
+    def manhattan_distance(self, cell1: int, cell2: int) -> int:
+        size = self.grid_size
+        return abs(cell1 % size - cell2 % size) + abs(cell1 // size - cell2 // size)
+
+    def _tick(self) -> None:
+        """Count a node and abort the current iteration once out of time"""
+        self.nodes += 1
+        if self.budget.exhausted() or ((self.nodes & 31) == 0 and time.perf_counter() > self._deadline):
+            raise _SearchTimeout()
+
+    def position_key(self, food: int) -> int:
+        """Zobrist key of the search position: occupancy, head, tail, food
+        and whether the snake is about to grow"""
+        snake = self.virtual_snake
+        key = (snake.hash ^ self.head_keys[snake.head_cell] ^
+               self.tail_keys[snake.tail_cell] ^ self.food_keys[food + 1])
+        return key ^ self.pending_key if snake.pending else key
+
+    def _ordered_moves(self, food: int, tt_move: int) -> List[int]:
+        """Legal head moves, transposition-table move first, then closest to food"""
+        snake = self.virtual_snake
+        occupied = snake.occupied
+        moves = [n for n in snake.neighbors[snake.head_cell] if not occupied[n]]
+        if food >= 0:
+            moves.sort(key=lambda cell: self.manhattan_distance(cell, food))
+        if tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        return moves
+
+    def evaluate(self, food: int) -> float:
+        """Cheap leaf heuristic: close to food, with room to move"""
+        snake = self.virtual_snake
+        head = snake.head_cell
+        score = 2.0 * snake.free_neighbors(head)
+        if food >= 0:
+            score -= self.manhattan_distance(head, food)
+        return score
+
+    def sample_spawns(self) -> List[int]:
+        """Sample food spawn cells under the Food.spawn rule"""
+        snake = self.virtual_snake
+        occupied, head, area = snake.occupied, snake.head_cell, snake.area
+        samples = []
+        # Rejection sampling is O(1) per sample until the board is nearly full
+        for _ in range(self.food_samples * 16):
+            cell = self.rng.randrange(area)
+            if not occupied[cell] and self.manhattan_distance(cell, head) > self.SPAWN_MIN_DISTANCE:
+                samples.append(cell)
+                if len(samples) == self.food_samples:
+                    return samples
+        free = [cell for cell in range(area) if not occupied[cell]]
+        distant = [cell for cell in free if self.manhattan_distance(cell, head) > self.SPAWN_MIN_DISTANCE]
+        pool = distant or free
+        return [self.rng.choice(pool) for _ in range(self.food_samples)] if pool else []
+
+    def chance_node(self, depth: int) -> float:
+        """Expected value over where the next food spawns"""
+        if depth <= 0:
+            return self.evaluate(-1)
+        spawns = self.sample_spawns()
+        if not spawns:
+            return self.EAT_REWARD  # Board is full
+        return sum(self.max_node(depth, food) for food in spawns) / len(spawns)
+
+    def max_node(self, depth: int, food: int) -> float:
+        """Best value over the snake's moves with the food at a known cell"""
+        self._tick()
+        snake = self.virtual_snake
+        key = self.position_key(food)
+        entry = self.transpositions.get(key)
+        if entry is not None and entry[0] >= depth:  # Only reuse searches at least as deep
+            return entry[1]
+
+        best_value, best_move = self.DEATH_PENALTY - depth, -1  # Later deaths are less bad
+        for cell in self._ordered_moves(food, entry[2] if entry else -1):
+            eats = cell == food
+            snake.advance_cell(cell, eat=eats)
+            if eats:
+                value = self.EAT_REWARD + depth + self.chance_node(depth - 1)  # Sooner is better
+            elif depth > 1:
+                value = self.max_node(depth - 1, food)
+            else:
+                value = self.evaluate(food)
+            snake.undo()
+            if value > best_value:
+                best_value, best_move = value, cell
+
+        self.transpositions[key] = (depth, best_value, best_move)
+        return best_value
+
+    def search_root(self, depth: int, food: int, root_moves: List[int], safe: Dict[int, bool]) -> Dict[int, float]:
+        """Value of each root move searched to the given depth"""
+        snake = self.virtual_snake
+        values = {}
+        for cell in root_moves:
+            eats = cell == food
+            snake.advance_cell(cell, eat=eats)
+            if eats:
+                value = self.EAT_REWARD + depth + self.chance_node(depth - 1)
+            elif depth > 1:
+                value = self.max_node(depth - 1, food)
+            else:
+                value = self.evaluate(food)
+            snake.undo()
+            values[cell] = value if safe[cell] else value + self.TRAP_PENALTY
+        return values
+
+    def principal_variation(self, first: int, food: int) -> List[Tuple[int, int]]:
+        """Follow transposition-table moves from the chosen move for visualization"""
+        snake = self.virtual_snake
+        path, cell = [], first
+        while cell >= 0 and len(path) < self.max_depth and snake.advance_cell(cell, eat=cell == food):
+            path.append(snake.pos_of(cell))
+            if cell == food:
+                break
+            entry = self.transpositions.get(self.position_key(food))
+            cell = entry[2] if entry else -1
+        snake.rewind()
+        return path
+
+    def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
+        snake = self.virtual_snake
+        snake.load(snake_body)
+        food = snake.cell_of(food_pos) if snake.in_bounds(food_pos) else -1
+        self.transpositions.clear()
+        self.nodes = 0
+        self.completed_depth = 0
+        self._deadline = time.perf_counter() + (self.budget.time_limit or self.time_limit)
+
+        root_moves = self._ordered_moves(food, -1)
+        if not root_moves:
+            self.current_path = []
+            return (0, 0)
+
+        # Tail reachability is too costly at every leaf, so it filters root moves only
+        safe = {}
+        for cell in root_moves:
+            snake.advance_cell(cell, eat=cell == food)
+            safe[cell] = snake.can_reach_tail()
+            snake.undo()
+
+        best = next((cell for cell in root_moves if safe[cell]), root_moves[0])
+        for depth in range(1, self.max_depth + 1):
+            try:
+                values = self.search_root(depth, food, root_moves, safe)
+            except _SearchTimeout:
+                snake.load(snake_body)  # The aborted iteration leaves moves unreverted
+                self.budget.truncated = True
+                break
+            best = max(root_moves, key=lambda cell: values[cell])
+            self.completed_depth = depth
+            # Search the previous best move first next iteration
+            root_moves.remove(best)
+            root_moves.insert(0, best)
+
+        self.current_path = self.principal_variation(best, food)
+        next_pos = snake.pos_of(best)
+        return (next_pos[0] - snake_head[0], next_pos[1] - snake_head[1])
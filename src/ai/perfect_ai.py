@@ -2,6 +2,7 @@ from typing import List, Tuple
 from .base import BaseAI
 from .astar import AStarAI
 from .hamiltonian import HamiltonianWithShortcutsAI
+from .endgame import EndgameSolver
 from src.utils.settings import GRID_SIZE
 
 class PerfectAI(BaseAI):
@@ -11,13 +12,27 @@ class PerfectAI(BaseAI):
         self.description = "Combines A* with Hamiltonian cycle and safe shortcuts"
         self.astar = AStarAI()
         self.hamiltonian = HamiltonianWithShortcutsAI()
+        self.share_budget(self.astar, self.hamiltonian)
+        self.endgame = EndgameSolver()
         self.current_strategy = "astar"
         self.current_path = []
 
+    def reset(self, board=None) -> None:
+        super().reset(board)
+        self.current_strategy = "astar"
+
     def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
         snake_length = len(snake_body)
         grid_area = GRID_SIZE * GRID_SIZE
 
+        # Solve nearly full boards exactly
+        if self.endgame.applies(snake_body):
+            move = self.endgame.solve(snake_head, food_pos, snake_body, self.budget)
+            if move is not None:
+                self.current_strategy = "endgame"
+                self.current_path = [(snake_head[0] + move[0], snake_head[1] + move[1])]
+                return move
+
         # Use A* when snake is short, switch to Hamiltonian with shortcuts when longer
         if snake_length < grid_area * 0.5:
             self.current_strategy = "astar"
@@ -1,6 +1,8 @@
 from typing import List, Tuple
 import random
-from src.ai.base import BaseAI
+import numpy as np
+from src.ai.base import BaseAI, batch_candidates, moves_from_choice
+from src.ai.virtual_snake import VirtualSnake
 
 class RandomWalkAI(BaseAI):
     def __init__(self):
@@ -8,6 +10,12 @@ class RandomWalkAI(BaseAI):
         self.name = "Random Walk"
         self.description = "Makes random valid moves"
         self.current_path = []
+        self.virtual_snake = VirtualSnake()
+        self.rng = None  # NumPy generator for batched moves, seeded from random on first use
+
+    def reset(self, board=None) -> None:
+        super().reset(board)
+        self.rng = None  # Reseed from random, so a seeded game plays the same on a reused instance
 
     def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
         valid_neighbors = self.get_valid_neighbors(snake_head, snake_body)
@@ -26,18 +34,36 @@ class RandomWalkAI(BaseAI):
             self.current_path = [next_pos]
             
             # Add a few potential future moves for visualization
-            current = next_pos
-            temp_body = snake_body[:-1] + [next_pos]  # Simulate snake's next position
+            snake = self.virtual_snake
+            snake.load(snake_body)
+            snake.advance(next_pos)  # Simulate snake's next position
             
             for _ in range(4):  # Look ahead 4 moves
-                future_neighbors = self.get_valid_neighbors(current, temp_body)
+                occupied = snake.occupied
+                future_neighbors = [n for n in snake.neighbors[snake.head_cell] if not occupied[n]]
                 if future_neighbors:
-                    future_pos = random.choice(future_neighbors)
+                    future_pos = snake.pos_of(random.choice(future_neighbors))
                     self.current_path.append(future_pos)
-                    current = future_pos
-                    temp_body = temp_body[:-1] + [future_pos]
+                    snake.advance(future_pos)
                 else:
                     break
+            snake.rewind()
             
             return (next_pos[0] - snake_head[0], next_pos[1] - snake_head[1])
-        return (0, 0)  # No valid moves available
\ No newline at end of file
+        return (0, 0)  # No valid moves available
+
+    batch_native = True
+    deterministic = False
+
+    def get_next_moves(self, heads: np.ndarray, foods: np.ndarray, occupancy: np.ndarray,
+                       bodies=None) -> np.ndarray:
+        """Food if it is a valid neighbor, otherwise a uniformly random valid move, for every game"""
+        if self.rng is None:
+            self.rng = np.random.default_rng(random.getrandbits(64))
+        candidates, valid = batch_candidates(heads, occupancy)
+        is_food = valid & (candidates == foods[:, None, :]).all(axis=2)
+        # Random keys in [0, 1) for valid moves; food outranks them, invalid moves rank last
+        keys = np.where(valid, self.rng.random(valid.shape), -1.0)
+        keys[is_food] = 2.0
+        self.current_path = []
+        return moves_from_choice(np.argmax(keys, axis=1), valid)
@@ -29,11 +29,18 @@ class ReverseAStarAI(BaseAI):
         open_set = [(0, 0, Node(start))]  # (priority, tiebreaker, node)
         closed_set: Set[Tuple[int, int]] = set()
         came_from: Dict[Tuple[int, int], Node] = {start: Node(start)}
+        longest = None  # Longest partial path, returned if the budget runs out
+        snake = self.context.at(snake_body).loaded()  # Body cells, read off its occupancy
         
         while open_set:
             _, _, current = heapq.heappop(open_set)
             
-            if current.pos == goal:
+            if current.pos != goal and self.budget.exhausted():
+                current = longest
+                if current is None:
+                    return []
+            
+            if current.pos == goal or self.budget.truncated:
                 path = []
                 while current.pos != start:
                     path.append(current.pos)
@@ -45,6 +52,8 @@ class ReverseAStarAI(BaseAI):
                 continue
                 
             closed_set.add(current.pos)
+            if longest is None or current.path_length > longest.path_length:
+                longest = current
             
             # Get valid neighbors
             neighbors = []
@@ -52,7 +61,7 @@ class ReverseAStarAI(BaseAI):
                 new_pos = (current.pos[0] + dx, current.pos[1] + dy)
                 if (0 <= new_pos[0] < self.grid_size and 
                     0 <= new_pos[1] < self.grid_size and 
-                    new_pos not in snake_body and
+                    not snake.occupied[snake.cell_of(new_pos)] and
                     new_pos not in closed_set):
                     neighbors.append(new_pos)
             
@@ -77,6 +86,13 @@ class ReverseAStarAI(BaseAI):
         self.reset_path()
         return []
 
+    def plan(self, start: Tuple[int, int], goal: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """find_path through the move context, so AIs sharing it search
+        each position at most once; returns a fresh list"""
+        path = self.context.at(snake_body).memo(
+            'reverse_astar_path', (start, goal), lambda: self.find_path(start, goal, snake_body))
+        return list(path)
+
     def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
         # Reset path if the current path is invalid
         if self.current_path:
@@ -86,7 +102,7 @@ class ReverseAStarAI(BaseAI):
                 self.reset_path()
         
         if not self.current_path:
-            self.current_path = self.find_path(snake_head, food_pos, snake_body)
+            self.current_path = self.plan(snake_head, food_pos, snake_body)
         
         if self.current_path:
             next_pos = self.current_path.pop(0)
@@ -0,0 +1,302 @@
+from typing import List, Tuple, Optional, Sequence
+from .virtual_snake import neighbor_table
+from src.utils.settings import GRID_SIZE
+
+BLOCKED = 1 << 30  # free_at value of a cell that never frees up
+
+class GridSearch:
+    """Shortest-path searches over a flat grid of cell ids (y * size + x).
+
+    Obstacles live in a free_at array: a cell may be entered on move t when
+    free_at[cell] < t. Free cells are 0 and, in the static model, body cells
+    are BLOCKED. In the time-aware model a body cell frees up once the tail
+    has moved past it, so paths may run through cells the body is about to
+    vacate. Parent and visited arrays are allocated once and reused, with
+    stamps instead of clearing between searches.
+    """
+
+    def __init__(self, grid_size: int = GRID_SIZE):
+        self.grid_size = grid_size
+        self.area = grid_size * grid_size
+        self.neighbors = neighbor_table(grid_size)
+        self.free_at = [0] * self.area
+        # Forward and backward halves keep separate parents and depths
+        self.parent = [-1] * self.area
+        self.parent_back = [-1] * self.area
+        self.depth = [0] * self.area
+        self.depth_back = [0] * self.area
+        self.seen = [0] * self.area
+        self.seen_back = [0] * self.area
+        self.on_path = bytearray(self.area)  # Cells on the current depth-first path
+        # Per depth of the depth-first path: the cell's children in search
+        # order, and the next one to try
+        self.children = [[] for _ in range(self.area + 1)]
+        self.next_child = [0] * (self.area + 1)
+        self._stamp = 0
+        self._body: List[int] = []
+        self.expansions = 0  # Nodes expanded by the last search
+        self.expansions_per_depth: List[int] = []  # Per deepening iteration of the last ida_star
+
+    def cell_of(self, pos: Tuple[int, int]) -> int:
+        return pos[1] * self.grid_size + pos[0]
+
+    def pos_of(self, cell: int) -> Tuple[int, int]:
+        return (cell % self.grid_size, cell // self.grid_size)
+
+    def load(self, snake_body: Sequence[Tuple[int, int]], time_aware: bool = False) -> None:
+        """Mark the body (head first) as obstacles"""
+        free_at = self.free_at
+        for cell in self._body:
+            free_at[cell] = 0
+        size, length = self.grid_size, len(snake_body)
+        self._body = [y * size + x for x, y in snake_body]
+        for i, cell in enumerate(self._body):
+            # Segment i leaves its cell after length - i moves; like Snake.move,
+            # the current tail still blocks the first move
+            free_at[cell] = length - i if time_aware else BLOCKED
+
+    def _next_stamp(self) -> int:
+        self._stamp += 1
+        return self._stamp
+
+    def _manhattan(self, cell1: int, cell2: int) -> int:
+        size = self.grid_size
+        return abs(cell1 % size - cell2 % size) + abs(cell1 // size - cell2 // size)
+
+    def _trace(self, cell: int, parent: List[int], stop: int) -> List[int]:
+        """Cells from just after stop to cell, following parent links"""
+        path = []
+        while cell != stop:
+            path.append(cell)
+            cell = parent[cell]
+        path.reverse()
+        return path
+
+    def bfs(self, start: int, goal: int, budget=None) -> List[int]:
+        """Breadth-first path from start to goal, excluding start. Out of
+        budget, returns the path to the expanded cell closest to the goal."""
+        stamp = self._next_stamp()
+        seen, parent, depth = self.seen, self.parent, self.depth
+        free_at, neighbors = self.free_at, self.neighbors
+        seen[start] = stamp
+        depth[start] = 0
+        queue = [start]
+        closest, closest_dist = start, self._manhattan(start, goal)
+        self.expansions = 0
+        read = 0
+        while read < len(queue):
+            cell = queue[read]
+            read += 1
+            if cell == goal:
+                return self._trace(goal, parent, start)
+            if budget is not None and budget.exhausted():
+                return self._trace(closest, parent, start)
+            self.expansions += 1
+            dist = self._manhattan(cell, goal)
+            if dist < closest_dist:
+                closest, closest_dist = cell, dist
+            step = depth[cell] + 1
+            for n in neighbors[cell]:
+                if seen[n] != stamp and free_at[n] < step:
+                    seen[n] = stamp
+                    parent[n] = cell
+                    depth[n] = step
+                    queue.append(n)
+        return []
+
+    def bidirectional(self, start: int, goal: int, budget=None) -> List[int]:
+        """Meet-in-the-middle BFS from start and from goal, excluding start.
+
+        The backward half cannot know when the snake will reach a cell, so
+        it only uses cells that are free by the Manhattan lower bound on
+        that time. Each round expands one whole layer of the smaller
+        frontier and the shortest connection found in it wins.
+        """
+        if start == goal:
+            return []
+        stamp = self._next_stamp()
+        seen, parent, depth = self.seen, self.parent, self.depth
+        seen_b, parent_b, depth_b = self.seen_back, self.parent_back, self.depth_back
+        free_at, neighbors = self.free_at, self.neighbors
+        seen[start] = seen_b[goal] = stamp
+        depth[start] = depth_b[goal] = 0
+        parent_b[goal] = -1
+        forward, backward = [start], [goal]
+        closest, closest_dist = start, self._manhattan(start, goal)
+        self.expansions = 0
+
+        while forward and backward:
+            meet, meet_len = -1, BLOCKED
+            if len(forward) <= len(backward):
+                frontier = []
+                for cell in forward:
+                    if budget is not None and budget.exhausted():
+                        return self._trace(closest, parent, start)
+                    self.expansions += 1
+                    dist = self._manhattan(cell, goal)
+                    if dist < closest_dist:
+                        closest, closest_dist = cell, dist
+                    step = depth[cell] + 1
+                    for n in neighbors[cell]:
+                        if seen[n] == stamp or free_at[n] >= step:
+                            continue
+                        seen[n] = stamp
+                        parent[n] = cell
+                        depth[n] = step
+                        if seen_b[n] == stamp:
+                            if step + depth_b[n] < meet_len:
+                                meet, meet_len = n, step + depth_b[n]
+                        else:
+                            frontier.append(n)
+                forward = frontier
+            else:
+                frontier = []
+                for cell in backward:
+                    if budget is not None and budget.exhausted():
+                        return self._trace(closest, parent, start)
+                    self.expansions += 1
+                    step = depth_b[cell] + 1
+                    for n in neighbors[cell]:
+                        if seen_b[n] == stamp:
+                            continue
+                        if seen[n] == stamp:
+                            # Forward reached n legally; every later cell on
+                            # the backward side is entered no sooner than its
+                            # Manhattan bound
+                            parent_b[n] = cell
+                            if depth[n] + step < meet_len:
+                                meet, meet_len = n, depth[n] + step
+                            seen_b[n] = stamp
+                            depth_b[n] = step
+                            continue
+                        if free_at[n] >= self._manhattan(start, n):
+                            continue
+                        seen_b[n] = stamp
+                        parent_b[n] = cell
+                        depth_b[n] = step
+                        frontier.append(n)
+                backward = frontier
+            if meet >= 0:
+                path = self._trace(meet, parent, start)
+                cell = parent_b[meet]
+                while cell >= 0:
+                    path.append(cell)
+                    cell = parent_b[cell]
+                return path
+        return []
+
+    def connected(self, start: int, goal: int) -> bool:
+        """Whether goal is in the same static free region as start"""
+        stamp = self._next_stamp()
+        seen, free_at, neighbors = self.seen, self.free_at, self.neighbors
+        seen[start] = stamp
+        stack = [start]
+        while stack:
+            cell = stack.pop()
+            for n in neighbors[cell]:
+                if n == goal:
+                    return True
+                if seen[n] != stamp and free_at[n] == 0:
+                    seen[n] = stamp
+                    stack.append(n)
+        return False
+
+    def _queue_children(self, depth: int, cell: int, h: int, goal: int) -> None:
+        """Fill depth's child buffer with the neighbours of cell, h away
+        from goal: the closer ones, then the further ones"""
+        size = self.grid_size
+        goal_x, goal_y = goal % size, goal // size
+        kids = self.children[depth]
+        kids.clear()
+        for n in self.neighbors[cell]:
+            if abs(n % size - goal_x) + abs(n // size - goal_y) < h:
+                kids.append(n)
+        for n in self.neighbors[cell]:
+            if abs(n % size - goal_x) + abs(n // size - goal_y) > h:
+                kids.append(n)
+        self.next_child[depth] = 0
+
+    def ida_star(self, start: int, goal: int, max_depth: Optional[int] = None, budget=None) -> List[int]:
+        """Iterative-deepening A* with the Manhattan bound, excluding start.
+
+        Each iteration is a depth-first search on an explicit stack of cell
+        ids, bounded by g + h. Every neighbour is one step closer to the
+        goal or one step further, so a cell's children (closer ones first)
+        are written into a buffer kept for its depth. The current path is
+        marked in a bitset and a stamped best-g table prunes cells already
+        reached more cheaply this iteration, so nothing is allocated or
+        copied per node. Out of budget, returns the path to the cell that
+        got closest to the goal.
+        """
+        self.expansions = 0
+        self.expansions_per_depth = []
+        if start == goal or not self.connected(start, goal):
+            return []  # Without a path, deepening would only stop at the board size
+        limit = max_depth if max_depth is not None else self.area
+        free_at, neighbors, on_path = self.free_at, self.neighbors, self.on_path
+        seen, best_g = self.seen, self.depth
+        children, next_child = self.children, self.next_child
+        manhattan = self._manhattan
+        bound = manhattan(start, goal)
+        closest, closest_dist = [], bound
+
+        while bound <= limit:
+            stamp = self._next_stamp()
+            seen[start] = stamp
+            best_g[start] = 0
+            path = [start]
+            on_path[start] = 1
+            next_bound = BLOCKED
+            expansions = 0
+            self._queue_children(0, start, manhattan(start, goal), goal)
+            while path:
+                if budget is not None and budget.exhausted():
+                    for cell in path:
+                        on_path[cell] = 0
+                    self.expansions_per_depth.append(expansions)
+                    return closest
+                top = len(path) - 1
+                kids, i = children[top], next_child[top]
+                if i == len(kids):
+                    on_path[path.pop()] = 0
+                    continue
+                next_child[top] = i + 1
+                cell = kids[i]
+                if on_path[cell] or free_at[cell] > 0:
+                    continue
+                g = len(path)
+                h = manhattan(cell, goal)
+                if g + h > bound:
+                    next_bound = min(next_bound, g + h)
+                    continue
+                if seen[cell] == stamp and best_g[cell] <= g:
+                    continue
+                seen[cell] = stamp
+                best_g[cell] = g
+                expansions += 1
+                self.expansions += 1
+                if cell == goal:
+                    for visited in path:
+                        on_path[visited] = 0
+                    self.expansions_per_depth.append(expansions)
+                    return path[1:] + [cell]
+                if h < closest_dist:
+                    closest, closest_dist = path[1:] + [cell], h
+                self._queue_children(len(path), cell, h, goal)
+                path.append(cell)
+                on_path[cell] = 1
+            self.expansions_per_depth.append(expansions)
+            if next_bound == BLOCKED:
+                break  # Goal unreachable
+            bound = next_bound
+        return []
+
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int], snake_body: Sequence[Tuple[int, int]],
+                  bidirectional: bool = False, time_aware: bool = False, budget=None) -> List[Tuple[int, int]]:
+        """Shortest path from start to goal as positions, excluding start"""
+        size = self.grid_size
+        if not (0 <= goal[0] < size and 0 <= goal[1] < size):
+            return []
+        self.load(snake_body, time_aware)
+        search = self.bidirectional if bidirectional else self.bfs
+        return [self.pos_of(cell) for cell in search(self.cell_of(start), self.cell_of(goal), budget)]
@@ -3,6 +3,8 @@ from .base import BaseAI
 from .astar import AStarAI
 from .wall_follower import WallFollowerAI
 from .hamiltonian import HamiltonianWithShortcutsAI
+from .virtual_snake import VirtualSnake
+from .endgame import EndgameSolver
 from src.utils.settings import GRID_SIZE
 
 class SmartHybridAI(BaseAI):
@@ -14,6 +16,15 @@ class SmartHybridAI(BaseAI):
         self.astar = AStarAI()
         self.wall_follower = WallFollowerAI()
         self.hamiltonian = HamiltonianWithShortcutsAI()
+        self.share_budget(self.astar, self.wall_follower, self.hamiltonian)
+        self.virtual_snake = VirtualSnake()
+        self.endgame = EndgameSolver()
+        self.current_strategy = "astar"
+        self.last_food_distance = 0
+        self.stuck_count = 0
+    
+    def reset(self, board=None) -> None:
+        super().reset(board)
         self.current_strategy = "astar"
         self.last_food_distance = 0
         self.stuck_count = 0
@@ -22,7 +33,9 @@ class SmartHybridAI(BaseAI):
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
     
     def is_move_safe(self, next_pos: Tuple[int, int], snake_body: List[Tuple[int, int]], look_ahead: int = 2) -> bool:
-        """Check if a move is safe by looking ahead several steps"""
+        """Check if a move is safe by looking ahead several steps. A flood
+        fill cut short by the budget counts too few cells, so a move is
+        only passed once enough cells have actually been counted."""
         # First check immediate collision
         if next_pos in snake_body[:-1]:  # Exclude tail as it will move
             return False
@@ -31,8 +44,9 @@ class SmartHybridAI(BaseAI):
         if not (0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE):
             return False
             
-        # Look ahead to check if we might get trapped
-        available_spaces = self.flood_fill(next_pos, snake_body[:-1])
+        # Look ahead to check if we might get trapped (the same flood fill
+        # as flood_fill(next_pos, snake_body[:-1]), shared for the move)
+        available_spaces = self.context.at(snake_body).reachable_from(next_pos, self.budget)
         min_safe_spaces = len(snake_body) + look_ahead
         
         return available_spaces >= min_safe_spaces
@@ -47,6 +61,8 @@ class SmartHybridAI(BaseAI):
         count = 1
         
         while queue:
+            if self.budget.exhausted():
+                break
             current = queue.pop(0)
             for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
                 next_pos = (current[0] + dx, current[1] + dy)
@@ -61,18 +77,18 @@ class SmartHybridAI(BaseAI):
         
         return count
     
-    def is_path_safe(self, path: List[Tuple[int, int]], snake_body: List[Tuple[int, int]]) -> bool:
-        """Check if entire path is safe"""
+    def is_path_safe(self, path: List[Tuple[int, int]], snake_body: List[Tuple[int, int]],
+                     food_pos: Tuple[int, int] = None) -> bool:
+        """Check the snake can follow the entire path and still reach its tail afterwards"""
         if not path:
             return False
             
-        temp_body = snake_body.copy()
-        for pos in path:
-            if not self.is_move_safe(pos, temp_body):
-                return False
-            temp_body = temp_body[1:] + [pos]
-        
-        return True
+        snake = self.virtual_snake
+        snake.load(snake_body)
+        safe = (snake.follow(path, food_pos) == len(path) and
+                snake.can_reach_tail(self.budget))
+        snake.rewind()
+        return safe
     
     def detect_stuck(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int]) -> bool:
         """Detect if snake is stuck in a pattern"""
@@ -94,8 +110,8 @@ class SmartHybridAI(BaseAI):
         grid_area = GRID_SIZE * GRID_SIZE
         
         # Try A* first
-        astar_path = self.astar.find_path(snake_head, food_pos, snake_body)
-        if astar_path and self.is_path_safe(astar_path, snake_body):
+        astar_path = self.astar.plan(snake_head, food_pos, snake_body)
+        if astar_path and self.is_path_safe(astar_path, snake_body, food_pos):
             self.stuck_count = 0  # Reset stuck counter if we have a good path
             return "astar"
         
@@ -113,6 +129,14 @@ class SmartHybridAI(BaseAI):
     
     def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], 
                       snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
+        # Solve nearly full boards exactly
+        if self.endgame.applies(snake_body):
+            move = self.endgame.solve(snake_head, food_pos, snake_body, self.budget)
+            if move is not None:
+                self.current_strategy = "endgame"
+                self.current_path = [(snake_head[0] + move[0], snake_head[1] + move[1])]
+                return move
+        
         # Choose the best strategy for current situation
         self.current_strategy = self.choose_strategy(snake_head, food_pos, snake_body)
         
@@ -146,5 +170,28 @@ class SmartHybridAI(BaseAI):
                 _, best_move = min(possible_moves)
                 self.current_path = [best_move]
                 return best_move
+            
+            if self.budget.truncated:
+                # Nothing was proven safe before the budget ran out: take
+                # the legal move with the most room counted so far
+                best_move = self.roomiest_move(snake_head, snake_body, move)
+                if best_move is not None:
+                    self.current_path = [best_move]
+                    return best_move
         
-        return move
\ No newline at end of file
+        return move
+    
+    def roomiest_move(self, snake_head: Tuple[int, int], snake_body: List[Tuple[int, int]],
+                      preferred: Tuple[int, int]):
+        """The legal move with the most reachable cells, as far as the flood
+        fills got, preferred among equals; None when every move collides"""
+        context = self.context.at(snake_body)
+        best_move, best_key = None, (0, False)
+        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+            next_pos = (snake_head[0] + dx, snake_head[1] + dy)
+            if not context.can_move(next_pos):
+                continue
+            key = (context.reachable_from(next_pos, self.budget), (dx, dy) == tuple(preferred))
+            if key > best_key:
+                best_move, best_key = (dx, dy), key
+        return best_move
\ No newline at end of file
@@ -1,5 +1,4 @@
 from typing import List, Tuple, Set, Dict, Optional
-from collections import deque
 import heapq
 from .base import BaseAI
 from .astar import AStarAI
@@ -13,28 +12,28 @@ class SmarterHybridAI(BaseAI):
         self.description = "Enhanced A* with trap detection and Reverse A* backup"
         self.astar = AStarAI()
         self.reverse_astar = ReverseAStarAI()
+        self.share_budget(self.astar, self.reverse_astar)
         self.current_strategy = "astar"
         self.current_path = []
         self.last_positions = []
         self.stuck_count = 0
     
+    def reset(self, board=None) -> None:
+        super().reset(board)
+        self.current_strategy = "astar"
+        self.last_positions = []
+        self.stuck_count = 0
+    
     def count_reachable_spaces(self, start_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> int:
-        """Count how many spaces are reachable from a position"""
-        visited = {start_pos}
-        queue = deque([start_pos])
-        
-        while queue:
-            current = queue.popleft()
-            for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                next_pos = (current[0] + dx, current[1] + dy)
-                if (0 <= next_pos[0] < GRID_SIZE and 
-                    0 <= next_pos[1] < GRID_SIZE and 
-                    next_pos not in snake_body and 
-                    next_pos not in visited):
-                    visited.add(next_pos)
-                    queue.append(next_pos)
-        
-        return len(visited)
+        """Count how many spaces are reachable from a position, once per
+        position through the move context"""
+        context = self.context.at(snake_body)
+        return context.memo('count_reachable', start_pos,
+                            lambda: context.loaded().count_reachable(start_pos, self.budget))
+    
+    def reachable_after_move(self, next_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> int:
+        """Count spaces reachable from the head after moving to next_pos"""
+        return self.context.at(snake_body).reachable_after(next_pos, self.budget)
     
     def is_safe_move(self, move: Tuple[int, int], snake_head: Tuple[int, int], 
                      snake_body: List[Tuple[int, int]]) -> bool:
@@ -42,25 +41,23 @@ class SmarterHybridAI(BaseAI):
         dx, dy = move
         next_pos = (snake_head[0] + dx, snake_head[1] + dy)
         
-        # Basic boundary and collision checks
-        if not (0 <= next_pos[0] < GRID_SIZE and 0 <= next_pos[1] < GRID_SIZE):
-            return False
-        if next_pos in snake_body[:-1]:
+        # Simulate the move (includes boundary and collision checks); the
+        # move context keeps each answer for the rest of this move
+        context = self.context.at(snake_body)
+        if not context.can_move(next_pos):
             return False
-            
-        # Simulate the move
-        temp_body = snake_body[1:] + [next_pos]
         
-        # Count immediate escape routes
-        neighbors = self.get_valid_neighbors(next_pos, temp_body)
-        if len(neighbors) == 0:
+        if context.free_neighbors_after(next_pos) == 0:
+            # No immediate escape route
             return False
-            
-        # Check if we have enough space after the move
-        # We need at least enough spaces for our body plus some buffer
+        if context.tail_reachable_after(next_pos, self.budget):
+            # Chasing our own tail always leaves a way out
+            return True
+        # Otherwise we need at least enough spaces for our body plus some buffer
         min_required_spaces = len(snake_body) + 2
-        reachable_spaces = self.count_reachable_spaces(next_pos, temp_body)
-        
+        # A flood fill cut short by the budget undercounts, so it can pass
+        # a move but never waives the check
+        reachable_spaces = context.reachable_after(next_pos, self.budget)
         return reachable_spaces >= min_required_spaces
     
     def is_in_loop(self, snake_head: Tuple[int, int]) -> bool:
@@ -111,8 +108,7 @@ class SmarterHybridAI(BaseAI):
             if self.is_safe_move(move, snake_head, snake_body):
                 dx, dy = move
                 next_pos = (snake_head[0] + dx, snake_head[1] + dy)
-                temp_body = snake_body[1:] + [next_pos]
-                space_count = self.count_reachable_spaces(next_pos, temp_body)
+                space_count = self.reachable_after_move(next_pos, snake_body)
                 # Prefer moves that give us more space
                 safe_moves.append((space_count, move))
         
@@ -122,15 +118,21 @@ class SmarterHybridAI(BaseAI):
             _, best_move = safe_moves[0]
             return best_move
             
+        context = self.context.at(snake_body)
+        if self.budget.truncated:
+            # Nothing was proven safe before the budget ran out: take the
+            # move with the most room counted so far, A*'s among equals
+            measured = [(context.reachable_after((snake_head[0] + dx, snake_head[1] + dy), self.budget),
+                         (dx, dy) == astar_move, (dx, dy)) for dx, dy in moves]
+            spaces, _, best_move = max(measured, key=lambda item: item[:2])
+            if spaces > 0:
+                return best_move
+        
         # If no safe moves found, try to find any move that doesn't kill us immediately
         for move in moves:
             dx, dy = move
             next_pos = (snake_head[0] + dx, snake_head[1] + dy)
-            if (0 <= next_pos[0] < GRID_SIZE and 
-                0 <= next_pos[1] < GRID_SIZE and 
-                next_pos not in snake_body[:-1]):
-                neighbors = self.get_valid_neighbors(next_pos, snake_body[1:] + [next_pos])
-                if neighbors:  # If there's at least one escape route
-                    return move
+            if context.free_neighbors_after(next_pos):  # If there's at least one escape route
+                return move
                     
         return (0, 0)  # No valid moves found
\ No newline at end of file
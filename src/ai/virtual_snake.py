@@ -0,0 +1,281 @@
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+from src.utils.settings import GRID_SIZE
+
+# Same order as BaseAI.get_valid_neighbors so ties break identically
+NEIGHBOR_OFFSETS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+_neighbor_tables: Dict[int, List[List[int]]] = {}
+_zobrist_tables: Dict[int, List[int]] = {}
+_cycles: Dict[int, Tuple[List[Tuple[int, int]], Dict[Tuple[int, int], int]]] = {}
+
+def neighbor_table(grid_size: int) -> List[List[int]]:
+    """In-bounds neighbor cell ids of every cell, shared per board size"""
+    table = _neighbor_tables.get(grid_size)
+    if table is None:
+        table = []
+        for cell in range(grid_size * grid_size):
+            x, y = cell % grid_size, cell // grid_size
+            table.append([
+                (y + dy) * grid_size + (x + dx)
+                for dx, dy in NEIGHBOR_OFFSETS
+                if 0 <= x + dx < grid_size and 0 <= y + dy < grid_size
+            ])
+        _neighbor_tables[grid_size] = table
+    return table
+
+def zobrist_keys(grid_size: int) -> List[int]:
+    """Random 64-bit key per cell for hashing occupancy, shared per board size"""
+    keys = _zobrist_tables.get(grid_size)
+    if keys is None:
+        rng = random.Random(grid_size)  # Fixed seed keeps hashes stable between runs
+        keys = [rng.getrandbits(64) for _ in range(grid_size * grid_size)]
+        _zobrist_tables[grid_size] = keys
+    return keys
+
+def serpentine_cycle(grid_size: int) -> Tuple[List[Tuple[int, int]], Dict[Tuple[int, int], int]]:
+    """The row-by-row cycle (closed by repeating its first cell) and each
+    cell's first index in it, shared per board size; treat both as read-only"""
+    entry = _cycles.get(grid_size)
+    if entry is None:
+        cycle = []
+        # Start from top-left, go right, then snake down
+        for y in range(grid_size):
+            row = range(grid_size) if y % 2 == 0 else range(grid_size-1, -1, -1)
+            for x in row:
+                cycle.append((x, y))
+        # Connect back to start
+        cycle.append((0, 0))
+        entry = (cycle, {pos: i for i, pos in enumerate(cycle[:-1])})
+        _cycles[grid_size] = entry
+    return entry
+
+class VirtualSnake:
+    """Simulated snake for look-ahead checks.
+
+    The body lives in a ring buffer of cell ids (y * size + x) next to an
+    occupancy grid, so advance() and undo() are O(1) and never copy the
+    body. Planners load the real body once, walk a candidate path, query
+    the resulting position and rewind.
+
+    Growth follows the Engine: a move that eats still frees the tail, and
+    the snake grows on the move after it, keeping its tail that once
+    (pending is set in between, and a growing snake may enter its own
+    tail cell). advance(grow=True) instead keeps the tail on the move
+    itself, for replaying moves the engine has already reported.
+    """
+
+    def __init__(self, snake_body: Optional[Sequence[Tuple[int, int]]] = None, grid_size: int = GRID_SIZE):
+        self.grid_size = grid_size
+        self.area = grid_size * grid_size
+        # Two spare slots: the head never overwrites the tail, even stacked on it
+        self.capacity = self.area + 2
+        self.neighbors = neighbor_table(grid_size)
+        self.zobrist = zobrist_keys(grid_size)
+        self.hash = 0  # XOR of the zobrist keys of occupied cells
+        self.cells = [0] * self.capacity
+        self.occupied = bytearray(self.area)
+        self.head_idx = 0
+        self.length = 0
+        self.pending = False  # Ate on the last move, so the next one keeps the tail
+        # Tail cell freed by each advance; -1 when it grew from a pending
+        # meal, -2 when it grew with grow=True and nothing pending
+        self.history: List[int] = []
+        # Scratch buffers for flood fills, reused between calls
+        self._seen = [0] * self.area
+        self._stamp = 0
+        self._queue = [0] * self.area
+        if snake_body:
+            self.load(snake_body)
+
+    def load(self, snake_body: Sequence[Tuple[int, int]], growing: bool = False) -> None:
+        """Replace the simulated body (head first) and clear the undo
+        history. growing says whether the snake just ate; AIs only see the
+        board, so they load a body that isn't growing."""
+        for i in range(self.length):
+            self.occupied[self.cells[(self.head_idx + i) % self.capacity]] = 0
+        size = self.grid_size
+        self.head_idx = 0
+        self.length = len(snake_body)
+        self.hash = 0
+        for i, (x, y) in enumerate(snake_body):
+            cell = y * size + x
+            self.cells[i] = cell
+            self.occupied[cell] += 1
+            self.hash ^= self.zobrist[cell]
+        self.pending = growing
+        self.history.clear()
+
+    # Coordinate helpers
+
+    def cell_of(self, pos: Tuple[int, int]) -> int:
+        return pos[1] * self.grid_size + pos[0]
+
+    def pos_of(self, cell: int) -> Tuple[int, int]:
+        return (cell % self.grid_size, cell // self.grid_size)
+
+    def in_bounds(self, pos: Tuple[int, int]) -> bool:
+        return 0 <= pos[0] < self.grid_size and 0 <= pos[1] < self.grid_size
+
+    # Body queries
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __contains__(self, pos: Tuple[int, int]) -> bool:
+        return self.in_bounds(pos) and self.occupied[self.cell_of(pos)] > 0
+
+    @property
+    def head_cell(self) -> int:
+        return self.cells[self.head_idx]
+
+    @property
+    def tail_cell(self) -> int:
+        return self.cells[(self.head_idx + self.length - 1) % self.capacity]
+
+    @property
+    def head(self) -> Tuple[int, int]:
+        return self.pos_of(self.head_cell)
+
+    @property
+    def tail(self) -> Tuple[int, int]:
+        return self.pos_of(self.tail_cell)
+
+    def free_cells(self) -> int:
+        return self.area - self.length
+
+    def tail_segment(self, n: int) -> Tuple[int, ...]:
+        """The last n body cells, tail first: the cells that free up over the next n moves"""
+        n = min(n, self.length)
+        cells, capacity, last = self.cells, self.capacity, self.head_idx + self.length - 1
+        return tuple(cells[(last - i) % capacity] for i in range(n))
+
+    def can_enter(self, cell: int) -> bool:
+        """Whether the head may move into cell. As in Engine.make, the tail
+        cell counts as occupied even though it is about to move, unless the
+        snake is growing and the tail stays put."""
+        occupied = self.occupied[cell]
+        return not occupied or (self.pending and occupied == 1 and cell == self.tail_cell)
+
+    def free_neighbors(self, cell: int) -> int:
+        """Number of unoccupied cells next to cell"""
+        occupied = self.occupied
+        return sum(1 for n in self.neighbors[cell] if not occupied[n])
+
+    # Make / unmake
+
+    def advance(self, pos: Tuple[int, int], eat: bool = False, grow: bool = False) -> bool:
+        """Move the head to an adjacent position, eating food there if eat
+        (the snake grows on its next move) and keeping the tail now if
+        grow. Returns False (and does nothing) if the move would collide
+        with a wall or the body."""
+        if not self.in_bounds(pos):
+            return False
+        return self.advance_cell(self.cell_of(pos), eat, grow)
+
+    def advance_cell(self, cell: int, eat: bool = False, grow: bool = False) -> bool:
+        """advance() for a cell id known to be on the board"""
+        if not self.can_enter(cell):
+            return False
+        if self.pending or grow:
+            self.history.append(-1 if self.pending else -2)
+            self.length += 1
+        else:
+            tail = self.tail_cell
+            self.occupied[tail] -= 1
+            self.hash ^= self.zobrist[tail]
+            self.history.append(tail)
+        self.head_idx = (self.head_idx - 1) % self.capacity
+        self.cells[self.head_idx] = cell
+        self.occupied[cell] += 1
+        self.hash ^= self.zobrist[cell]
+        self.pending = eat
+        return True
+
+    def undo(self) -> None:
+        """Revert the most recent advance()"""
+        freed_tail = self.history.pop()
+        head = self.cells[self.head_idx]
+        self.occupied[head] -= 1
+        self.hash ^= self.zobrist[head]
+        self.head_idx = (self.head_idx + 1) % self.capacity
+        self.pending = freed_tail == -1
+        if freed_tail < 0:
+            self.length -= 1
+        else:
+            # Deep look-aheads can wrap around the ring onto the freed slot
+            self.cells[(self.head_idx + self.length - 1) % self.capacity] = freed_tail
+            self.occupied[freed_tail] += 1
+            self.hash ^= self.zobrist[freed_tail]
+
+    def rewind(self, steps: Optional[int] = None) -> None:
+        """Undo the last steps advances, or all of them"""
+        if steps is None:
+            steps = len(self.history)
+        for _ in range(steps):
+            self.undo()
+
+    def commit(self) -> None:
+        """Keep the current position and forget how it was reached"""
+        self.history.clear()
+
+    def follow(self, path: Sequence[Tuple[int, int]], food_pos: Optional[Tuple[int, int]] = None) -> int:
+        """Advance along path, eating the food if it lies on the path.
+        Returns the number of steps taken; fewer than len(path) means the
+        path collides."""
+        for steps, pos in enumerate(path):
+            if not self.advance(pos, eat=pos == food_pos):
+                return steps
+        return len(path)
+
+    # Flood fills over the occupancy grid
+
+    def _next_stamp(self) -> int:
+        self._stamp += 1
+        return self._stamp
+
+    def count_reachable(self, start: Optional[Tuple[int, int]] = None, budget=None) -> int:
+        """Count cells reachable from start (default: the head), start included"""
+        start_cell = self.head_cell if start is None else self.cell_of(start)
+        stamp = self._next_stamp()
+        seen, queue, occupied, neighbors = self._seen, self._queue, self.occupied, self.neighbors
+        seen[start_cell] = stamp
+        queue[0] = start_cell
+        read, write = 0, 1
+        while read < write:
+            if budget is not None and budget.exhausted():
+                break
+            cell = queue[read]
+            read += 1
+            for n in neighbors[cell]:
+                if seen[n] != stamp and not occupied[n]:
+                    seen[n] = stamp
+                    queue[write] = n
+                    write += 1
+        return write
+
+    def can_reach_tail(self, budget=None) -> bool:
+        """Whether the head can get next to its tail through free cells, so
+        that it can keep chasing the tail instead of trapping itself. False
+        when the budget runs out first: an unfinished search proves nothing,
+        and callers check budget.truncated to tell the two apart."""
+        head = self.head_cell
+        tail = self.tail_cell if self.length > 1 else -1
+        stamp = self._next_stamp()
+        seen, queue, occupied, neighbors = self._seen, self._queue, self.occupied, self.neighbors
+        seen[head] = stamp
+        queue[0] = head
+        read, write = 0, 1
+        while read < write:
+            if budget is not None and budget.exhausted():
+                return False  # Out of budget: unverified
+            cell = queue[read]
+            read += 1
+            for n in neighbors[cell]:
+                if seen[n] != stamp and not occupied[n]:
+                    if tail < 0 or tail in neighbors[n]:
+                        return True
+                    seen[n] = stamp
+                    queue[write] = n
+                    write += 1
+        return False
@@ -1,5 +1,7 @@
 from typing import List, Tuple, Set
+import numpy as np
 from .base import BaseAI
+from .virtual_snake import VirtualSnake
 from src.utils.settings import GRID_SIZE
 
 class WallFollowerAI(BaseAI):
@@ -10,37 +12,127 @@ class WallFollowerAI(BaseAI):
         self.current_path = []
         self.current_direction = (1, 0)  # Start moving right
         self.preferred_side = "right"  # Follow right wall by default
+        self.directions = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+        self.virtual_snake = VirtualSnake()
+        # Free cells between each cell and the nearest obstacle, per direction
+        self.rays = [[0] * (GRID_SIZE * GRID_SIZE) for _ in self.directions]
+        self.steps = [dy * GRID_SIZE + dx for dx, dy in self.directions]  # Cell id offsets
+        self.last_body: List[Tuple[int, int]] = []  # Body the rays were last synced to
+        self.tracking = False  # Whether engine events are keeping the rays current
     
-    def is_wall(self, pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> bool:
+    def reset(self, board=None) -> None:
+        super().reset(board)
+        self.current_direction = (1, 0)
+        self.last_body = []
+        # With a board, engine events keep the virtual body and rays current
+        self.tracking = board is not None
+        if board is not None:
+            self.virtual_snake.load(board.body)
+            self.build_rays()
+    
+    def on_step(self, head_added, tail_removed) -> None:
+        """Play the move on the virtual body and refresh the rays through
+        the two cells that changed"""
+        if not self.tracking:
+            return
+        snake = self.virtual_snake
+        freed_tail = snake.tail_cell
+        if not snake.advance(head_added, grow=tail_removed is None):
+            self.tracking = False  # A move the virtual body can't follow; resync from the body
+            return
+        snake.commit()
+        if tail_removed is not None:
+            self.refresh_rays(freed_tail)
+        self.refresh_rays(snake.head_cell)
+    
+    def on_game_end(self, reason) -> None:
+        self.tracking = False
+    
+    def is_wall(self, pos: Tuple[int, int]) -> bool:
         """Check if a position is a wall (grid boundary or snake body)"""
         x, y = pos
         return (x < 0 or x >= GRID_SIZE or 
                 y < 0 or y >= GRID_SIZE or 
-                pos in snake_body)
+                self.virtual_snake.occupied[y * GRID_SIZE + x] > 0)
+    
+    def build_rays(self) -> None:
+        """Fill the distance-to-obstacle table for the loaded body with
+        running min/max scans over the occupancy grid, O(N)"""
+        blocked = np.frombuffer(self.virtual_snake.occupied, dtype=np.uint8).reshape(GRID_SIZE, GRID_SIZE) > 0
+        right, left = self._scan_rows(blocked)         # Rows run along x
+        down, up = self._scan_rows(blocked.T)          # Columns run along y
+        self.rays = [right.ravel().tolist(), down.T.ravel().tolist(),
+                     left.ravel().tolist(), up.T.ravel().tolist()]
+    
+    def _scan_rows(self, blocked: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Free cells before the next obstacle along each row, forwards and backwards"""
+        size = blocked.shape[1]
+        index = np.arange(size)
+        # Nearest obstacle index at or after / at or before each cell, walls just off the board
+        after = np.minimum.accumulate(np.where(blocked, index, size)[:, ::-1], axis=1)[:, ::-1]
+        before = np.maximum.accumulate(np.where(blocked, index, -1), axis=1)
+        walls_after = np.full((blocked.shape[0], 1), size)
+        walls_before = np.full((blocked.shape[0], 1), -1)
+        forward = np.hstack((after[:, 1:], walls_after)) - index - 1
+        backward = index - np.hstack((walls_before, before[:, :-1])) - 1
+        return forward, backward
     
-    def find_nearest_wall(self, pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
+    def refresh_rays(self, cell: int) -> None:
+        """Update the rays that run into cell after it was occupied or freed"""
+        occupied = self.virtual_snake.occupied
+        x, y = cell % GRID_SIZE, cell // GRID_SIZE
+        behind = (x, y, GRID_SIZE - 1 - x, GRID_SIZE - 1 - y)  # Cells upstream of each ray
+        for ray, step, count in zip(self.rays, self.steps, behind):
+            # Walk back against the ray until a cell that blocks it, or one
+            # whose distance is unchanged so nothing further back changes either
+            for c in range(cell - step, cell - step * (count + 1), -step):
+                n = c + step
+                value = 0 if occupied[n] else ray[n] + 1
+                if ray[c] == value:
+                    break
+                ray[c] = value
+                if occupied[c]:
+                    break
+    
+    def sync(self, snake_body: List[Tuple[int, int]]) -> None:
+        """Bring the virtual body and rays up to date. A normal move only
+        changes the head and tail cells, so only the rays through those
+        two are refreshed; anything else (a new game) rebuilds them."""
+        snake = self.virtual_snake
+        last = self.last_body
+        grew = len(snake_body) == len(last) + 1
+        if (last and (grew or len(snake_body) == len(last)) and
+                snake_body[1:] == last[:len(snake_body) - 1]):
+            freed_tail = snake.tail_cell
+            if snake.advance(snake_body[0], grow=grew):
+                snake.commit()
+                if not grew:
+                    self.refresh_rays(freed_tail)
+                self.refresh_rays(snake.head_cell)
+                self.last_body = list(snake_body)
+                return
+        snake.load(snake_body)
+        self.build_rays()
+        self.last_body = list(snake_body)
+    
+    def find_nearest_wall(self, pos: Tuple[int, int]) -> Tuple[int, int]:
         """Find direction to nearest wall or edge"""
         # Check all directions and find closest wall
-        directions = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+        cell = pos[1] * GRID_SIZE + pos[0]
         min_dist = float('inf')
-        best_direction = directions[0]
-        
-        for dx, dy in directions:
-            dist = 0
-            current = pos
-            while not self.is_wall((current[0] + dx, current[1] + dy), snake_body):
-                dist += 1
-                current = (current[0] + dx, current[1] + dy)
-            
+        best_direction = self.directions[0]
+        
+        for ray, direction in zip(self.rays, self.directions):
+            dist = ray[cell]
             if dist < min_dist:
                 min_dist = dist
-                best_direction = (dx, dy)
+                best_direction = direction
         
         return best_direction
     
-    def has_wall_on_side(self, pos: Tuple[int, int], direction: Tuple[int, int], snake_body: List[Tuple[int, int]], side: str) -> bool:
+    def has_wall_on_side(self, pos: Tuple[int, int], direction: Tuple[int, int], side: str) -> bool:
         """Check if there's a wall on the specified side relative to current direction"""
-        directions = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+        directions = self.directions
         current_idx = directions.index(direction)
         
         # Get the direction to check (right or left of current direction)
@@ -49,19 +141,19 @@ class WallFollowerAI(BaseAI):
         
         # Position to check for wall
         check_pos = (pos[0] + check_direction[0], pos[1] + check_direction[1])
-        return self.is_wall(check_pos, snake_body)
+        return self.is_wall(check_pos)
     
-    def get_next_direction(self, current_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
+    def get_next_direction(self, current_pos: Tuple[int, int]) -> Tuple[int, int]:
         """Get next direction following wall on preferred side"""
-        directions = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+        directions = self.directions
         current_idx = directions.index(self.current_direction)
         
         # Check if we're following a wall
-        has_wall = self.has_wall_on_side(current_pos, self.current_direction, snake_body, self.preferred_side)
+        has_wall = self.has_wall_on_side(current_pos, self.current_direction, self.preferred_side)
         
         if not has_wall:
             # If we're not following a wall, find the nearest one
-            wall_direction = self.find_nearest_wall(current_pos, snake_body)
+            wall_direction = self.find_nearest_wall(current_pos)
             # If the nearest wall isn't in our current direction, turn towards it
             if wall_direction != self.current_direction:
                 return wall_direction
@@ -71,7 +163,7 @@ class WallFollowerAI(BaseAI):
             # Try to continue forward while keeping wall on preferred side
             forward_pos = (current_pos[0] + self.current_direction[0],
                          current_pos[1] + self.current_direction[1])
-            if not self.is_wall(forward_pos, snake_body):
+            if not self.is_wall(forward_pos):
                 return self.current_direction
         
         # If we can't go forward, try turning while maintaining wall contact
@@ -84,43 +176,50 @@ class WallFollowerAI(BaseAI):
             new_direction = directions[turn]
             new_pos = (current_pos[0] + new_direction[0],
                       current_pos[1] + new_direction[1])
-            if not self.is_wall(new_pos, snake_body):
+            if not self.is_wall(new_pos):
                 return new_direction
         
         return self.current_direction
     
-    def look_ahead(self, pos: Tuple[int, int], direction: Tuple[int, int], snake_body: List[Tuple[int, int]], steps: int = 10) -> List[Tuple[int, int]]:
-        """Look ahead several steps to show planned path"""
+    def look_ahead(self, pos: Tuple[int, int], direction: Tuple[int, int], steps: int = 10) -> List[Tuple[int, int]]:
+        """Look ahead several steps to show planned path. The path is only
+        drawn, so steps run on the virtual body but read the move's rays."""
         path = []
         current_pos = pos
         current_direction = direction
-        temp_body = snake_body.copy()
         
         for _ in range(steps):
             next_pos = (current_pos[0] + current_direction[0],
                        current_pos[1] + current_direction[1])
             
-            if self.is_wall(next_pos, temp_body):
+            if self.is_wall(next_pos):
                 break
             
             path.append(next_pos)
             current_pos = next_pos
-            temp_body = temp_body[:-1] + [next_pos]
-            current_direction = self.get_next_direction(current_pos, temp_body)
+            self.virtual_snake.advance(next_pos)
+            current_direction = self.get_next_direction(current_pos)
         
+        self.virtual_snake.rewind(len(path))
         return path
     
     def get_next_move(self, snake_head: Tuple[int, int], food_pos: Tuple[int, int], snake_body: List[Tuple[int, int]]) -> Tuple[int, int]:
+        snake = self.virtual_snake
+        if not (self.tracking and snake.length == len(snake_body) and
+                snake.head == snake_head and snake.tail == snake_body[-1]):
+            self.tracking = False
+            self.sync(snake_body)
+        
         # If food is adjacent and reachable, go for it
-        neighbors = self.get_valid_neighbors(snake_head, snake_body)
-        if food_pos in neighbors:
+        if (abs(food_pos[0] - snake_head[0]) + abs(food_pos[1] - snake_head[1]) == 1 and
+                not self.is_wall(food_pos)):
             self.current_path = [food_pos]
             return (food_pos[0] - snake_head[0], food_pos[1] - snake_head[1])
         
         # Get next direction following the wall
-        self.current_direction = self.get_next_direction(snake_head, snake_body)
+        self.current_direction = self.get_next_direction(snake_head)
         
         # Look ahead and update current_path for visualization
-        self.current_path = self.look_ahead(snake_head, self.current_direction, snake_body)
+        self.current_path = self.look_ahead(snake_head, self.current_direction)
         
         return self.current_direction
\ No newline at end of file
@@ -1,5 +1,6 @@
+from .engine import BodyView, Engine
 from .snake import Snake
 from .food import Food
 from .game_state import GameState
 
-__all__ = ['Snake', 'Food', 'GameState']
+__all__ = ['BodyView', 'Engine', 'Snake', 'Food', 'GameState']
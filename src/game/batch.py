@@ -0,0 +1,89 @@
+import random
+import time
+from typing import List, Tuple, Optional
+import numpy as np
+from src.game.engine import BodyView, Engine, GAME_OVER, WALL, SELF
+from src.utils.settings import GRID_SIZE
+
+class BatchSimulator:
+    """Plays many headless games in lockstep against one AI.
+
+    Each step asks the AI for every live game's move in a single
+    get_next_moves call, then plays each move on that game's Engine, so
+    the rules are exactly those of every other front-end. One AI answers
+    for every game, so the engines send it no events; it is reset once
+    without a board before play starts. AIs that set
+    batch_native read the heads, foods and occupancy grids as arrays and
+    never touch the bodies. The occupancy grids are kept between steps
+    and only the cells a move changed are rewritten.
+    """
+
+    def __init__(self, ai, num_games: int, grid_size: int = GRID_SIZE,
+                 max_steps: Optional[int] = None, seed: Optional[int] = None):
+        self.ai = ai
+        self.num_games = num_games
+        self.grid_size = grid_size
+        self.area = grid_size * grid_size
+        self.max_steps = max_steps if max_steps is not None else self.area * 4
+        self.rng = random.Random(seed if seed is not None else random.getrandbits(64))
+        self.engines = [Engine(grid_size, self.rng) for _ in range(num_games)]
+        # Every game's occupancy as the AIs see it, (game, cell), kept in step with the engines
+        self.occupancy = np.zeros((num_games, self.area), dtype=bool)
+        for k, engine in enumerate(self.engines):
+            self.occupancy[k] = np.frombuffer(engine.occupied, dtype=np.uint8) > 0
+        self.alive = np.ones(num_games, dtype=bool)
+        self.scores = np.zeros(num_games, dtype=np.int64)
+        self.steps = np.zeros(num_games, dtype=np.int64)
+
+    def bodies(self, games: np.ndarray) -> List[BodyView]:
+        """Head-first body views, for AIs without a native batch policy"""
+        return [self.engines[k].body for k in games]
+
+    def step(self) -> None:
+        """Advance every live game by one move"""
+        games = np.flatnonzero(self.alive)
+        size, engines = self.grid_size, self.engines
+        heads = np.array([engines[k].positions[engines[k].head_cell()] for k in games])
+        foods = np.array([engines[k].food for k in games])
+        # A view of the grids while every game is live, a copy of the live ones after
+        occupancy = self.occupancy if len(games) == self.num_games else self.occupancy[games]
+        bodies = None if self.ai.batch_native else self.bodies(games)
+        self.ai.begin_move()
+        moves = self.ai.get_next_moves(heads, foods, occupancy.reshape(-1, size, size), bodies)
+
+        games = games.tolist()
+        over, moved, new_heads, old_tails, tail_occupied = [], [], [], [], []
+        for k, (dx, dy) in zip(games, moves.tolist()):
+            engine = engines[k]
+            tail = engine.tail_cell()
+            outcome = engine.step(dx, dy)
+            if outcome in GAME_OVER:  # Collision, or no space left for food
+                over.append(k)
+            if outcome != WALL and outcome != SELF:
+                # Only the new head and the old tail cell can have changed
+                moved.append(k)
+                new_heads.append(engine.head_cell())
+                old_tails.append(tail)
+                tail_occupied.append(engine.occupied[tail] > 0)
+        self.occupancy[moved, new_heads] = True
+        self.occupancy[moved, old_tails] = tail_occupied
+        self.steps[games] += 1
+        self.scores[games] = [engines[k].score for k in games]
+        self.alive[over] = False
+        self.alive[self.steps >= self.max_steps] = False
+
+    def run(self) -> dict:
+        """Play every game to the end; returns per-game scores and steps"""
+        self.ai.reset()
+        start = time.perf_counter()
+        while self.alive.any():
+            self.step()
+        elapsed = time.perf_counter() - start
+        total_steps = int(self.steps.sum())
+        return {
+            'scores': self.scores.tolist(),
+            'steps': self.steps.tolist(),
+            'average_score': float(self.scores.mean()),
+            'max_score': int(self.scores.max()),
+            'moves_per_second': total_steps / elapsed if elapsed > 0 else 0.0
+        }
@@ -0,0 +1,376 @@
+import random
+from collections.abc import Sequence
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.utils.settings import GRID_SIZE
+
+# Outcomes of Engine.step; the collision and board_full ones end the game
+MOVED = "moved"
+ATE = "ate"
+WALL = "wall"
+SELF = "self"
+BOARD_FULL = "board_full"
+
+GAME_OVER = (WALL, SELF, BOARD_FULL)
+
+NO_FOOD = (-1, -1)  # Food position when there is none on the board
+NO_CELL = -1        # Food cell when there is none on the board
+
+SPAWN_MIN_DISTANCE = 3  # Food prefers cells further than this from the head
+
+_near_tables: Dict[int, List[List[int]]] = {}
+
+def near_cell_table(grid_size: int) -> List[List[int]]:
+    """Cells within SPAWN_MIN_DISTANCE steps of every cell, shared per board size"""
+    table = _near_tables.get(grid_size)
+    if table is None:
+        reach = range(-SPAWN_MIN_DISTANCE, SPAWN_MIN_DISTANCE + 1)
+        table = []
+        for cell in range(grid_size * grid_size):
+            x, y = cell % grid_size, cell // grid_size
+            table.append([
+                (y + dy) * grid_size + (x + dx)
+                for dx in reach for dy in reach
+                if abs(dx) + abs(dy) <= SPAWN_MIN_DISTANCE
+                and 0 <= x + dx < grid_size and 0 <= y + dy < grid_size
+            ])
+        _near_tables[grid_size] = table
+    return table
+
+class EngineSnapshot:
+    """Preallocated copy of an Engine's state for Engine.snapshot/restore"""
+
+    def __init__(self, engine: 'Engine'):
+        self.cells = list(engine.cells)
+        self.occupied = bytearray(engine.occupied)
+        self.scalars = ()
+
+class BodyView(Sequence):
+    """The body as the AIs see it: a read-only, head-first sequence of
+    (x, y) tuples over the engine's ring buffer, so nothing is copied.
+
+    body[i] is the segment i moves behind the head (body[0] the head,
+    body[-1] the tail), head and tail are O(1), and `pos in body` reads
+    the occupancy counts instead of scanning. Slices, copy() and + give
+    plain lists, and a view equals a list holding the same segments, so
+    code written for the old body list works unchanged.
+
+    A view describes the position it was taken at until the engine next
+    changes; keep list(view) to remember a body past that.
+    """
+
+    __slots__ = ('engine', 'start', 'length')
+
+    def __init__(self, engine: 'Engine'):
+        self.engine = engine
+        self.start = engine.head_index
+        self.length = engine.length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def cell_ids(self) -> List[int]:
+        """The segments' cell ids, head first"""
+        cells, capacity = self.engine.cells, self.engine.capacity
+        start, end = self.start, self.start + self.length
+        if end <= capacity:
+            return cells[start:end]
+        return cells[start:] + cells[:end - capacity]
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return map(self.engine.positions.__getitem__, self.cell_ids())
+
+    def __getitem__(self, index):
+        engine = self.engine
+        if isinstance(index, slice):
+            positions = engine.positions
+            return [positions[cell] for cell in self.cell_ids()[index]]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("body index out of range")
+        return engine.positions[engine.cells[(self.start + index) % engine.capacity]]
+
+    def __contains__(self, pos) -> bool:
+        try:
+            x, y = pos
+        except (TypeError, ValueError):
+            return False
+        size = self.engine.grid_size
+        return 0 <= x < size and 0 <= y < size and self.engine.occupied[y * size + x] > 0
+
+    @property
+    def head(self) -> Tuple[int, int]:
+        return self[0]
+
+    @property
+    def tail(self) -> Tuple[int, int]:
+        return self[-1]
+
+    def copy(self) -> List[Tuple[int, int]]:
+        return list(self)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (BodyView, list)):
+            return self.length == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # Unhashable, like the list it stands in for
+
+    def __add__(self, other) -> List[Tuple[int, int]]:
+        return list(self) + list(other)
+
+    def __radd__(self, other) -> List[Tuple[int, int]]:
+        return list(other) + list(self)
+
+    def __repr__(self) -> str:
+        return f"BodyView({list(self)!r})"
+
+class Engine:
+    """The game rules, shared by every way of playing.
+
+    State in, move in, outcome out: step() applies one (dx, dy) move,
+    resolves collisions, eating and food spawning, and reports what
+    happened. Snake, Food and GameState are views over an Engine for the
+    interactive game and run_normal_headless; BatchSimulator drives
+    engines directly.
+
+    The body is a ring buffer of cell ids (y * size + x) next to an
+    occupancy count per cell, so moves and collision checks are O(1); the
+    food is a cell id too. body and food convert to (x, y) for the AIs.
+    Counts rather than flags because a growing snake may move into its
+    own tail cell, which then holds two segments. The AIs read the body
+    through a BodyView over the ring buffer, made on demand and cached
+    until the next move.
+
+    Planners can play moves with make() and take them back with unmake(),
+    which restores the freed tail cell and the food; the undo records go
+    into preallocated arrays, so exploring allocates nothing. snapshot()
+    and restore() copy the whole state in O(board) into a reusable
+    EngineSnapshot.
+
+    Listeners (AIs) hear about the game as it is played for real:
+    on_game_start(engine) from reset(), then on_step(head_added,
+    tail_removed), on_grow() and on_food_spawned(pos) from step(), and
+    on_game_end(reason) once, from step() on a collision or a full board,
+    or from end() when a runner stops the game. tail_removed is None on a
+    move that grew the snake. make() and unmake() send nothing, so
+    look-ahead stays silent.
+    """
+
+    def __init__(self, grid_size: int = GRID_SIZE, rng=random, listeners=()):
+        self.grid_size = grid_size
+        self.area = grid_size * grid_size
+        # Segments can stack on the tail cell, so leave the ring room past one per cell
+        self.capacity = self.area * 2
+        self.rng = rng  # Food placement; the random module by default, like Food.spawn
+        self.positions = [(cell % grid_size, cell // grid_size) for cell in range(self.area)]
+        # Cells in the order Food.spawn lists them (x outer, y inner), so
+        # the same random draw picks the same cell
+        self.spawn_order = [y * grid_size + x for x in range(grid_size) for y in range(grid_size)]
+        self.near_cells = near_cell_table(grid_size)
+        self.cells = [0] * self.capacity
+        self.occupied = bytearray(self.area)
+        # Undo records of make(), one slot per move made and not yet unmade
+        self.depth = 0
+        self._freed_tail = [0] * self.area  # -1 when the move grew the snake
+        self._food = [NO_CELL] * self.area
+        self._steps_without_food = [0] * self.area
+        self.listeners = list(listeners)
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new game: one segment in the middle, food near a corner"""
+        size = self.grid_size
+        start = (size // 2) * size + size // 2
+        self.occupied[:] = bytes(self.area)
+        self.head_index = 0
+        self.length = 1
+        self.cells[0] = start
+        self.occupied[start] = 1
+        self.food_cell = (size - 5) * size + size - 5
+        self.growing = False  # The snake grows on the move after eating
+        self.score = 0
+        self.steps = 0
+        self.steps_without_food = 0
+        self.depth = 0
+        self.over = False  # Set once on_game_end has gone out
+        self._body: Optional[BodyView] = None
+        for listener in self.listeners:
+            listener.on_game_start(self)
+
+    @property
+    def body(self) -> BodyView:
+        """The body head first as (x, y) tuples, valid until the next move"""
+        if self._body is None:
+            self._body = BodyView(self)
+        return self._body
+
+    @property
+    def food(self) -> Tuple[int, int]:
+        """The food as (x, y), NO_FOOD when there is none"""
+        return self.positions[self.food_cell] if self.food_cell >= 0 else NO_FOOD
+
+    def head_cell(self) -> int:
+        return self.cells[self.head_index]
+
+    def tail_cell(self) -> int:
+        return self.cells[(self.head_index + self.length - 1) % self.capacity]
+
+    def make(self, dx: int, dy: int, spawn: bool = True) -> str:
+        """Move the head by (dx, dy) and record how to undo it; returns
+        MOVED, ATE, WALL, SELF or BOARD_FULL. A collision changes nothing
+        and records nothing. With spawn=False, eating leaves the food at
+        NO_CELL instead of drawing a new cell, so look-ahead doesn't use up
+        the game's random numbers."""
+        size, occupied = self.grid_size, self.occupied
+        head = self.cells[self.head_index]
+        x, y = head % size + dx, head // size + dy
+        if not (0 <= x < size and 0 <= y < size):
+            return WALL
+        cell = y * size + x
+
+        # The tail cell blocks unless the snake is growing, like Snake.move always did
+        blockers = occupied[cell]
+        if blockers and self.growing:
+            blockers -= cell == self.tail_cell()
+        if blockers:
+            return SELF
+
+        depth = self.depth
+        if depth == len(self._food):  # Deeper than any look-ahead so far
+            self._freed_tail.extend([0] * depth)
+            self._food.extend([NO_CELL] * depth)
+            self._steps_without_food.extend([0] * depth)
+        self._food[depth] = self.food_cell
+        self._steps_without_food[depth] = self.steps_without_food
+        if self.growing:
+            self.growing = False
+            self.length += 1
+            self._freed_tail[depth] = -1
+        else:
+            tail = self.tail_cell()
+            occupied[tail] -= 1
+            self._freed_tail[depth] = tail
+        self.depth = depth + 1
+        self.head_index = (self.head_index - 1) % self.capacity
+        self.cells[self.head_index] = cell
+        occupied[cell] += 1
+        self.steps += 1
+        self._body = None
+
+        if cell != self.food_cell:
+            self.steps_without_food += 1
+            return MOVED
+        self.score += 1
+        self.growing = True
+        self.steps_without_food = 0
+        if not spawn:
+            self.food_cell = NO_CELL
+            return ATE
+        return ATE if self.spawn_food() else BOARD_FULL
+
+    def unmake(self) -> None:
+        """Take back the most recent make(): the head cell empties, the
+        freed tail cell (or the growth) comes back, and so does the food"""
+        self.depth -= 1
+        depth = self.depth
+        head = self.cells[self.head_index]
+        self.occupied[head] -= 1
+        self.head_index = (self.head_index + 1) % self.capacity
+        freed_tail = self._freed_tail[depth]
+        if freed_tail < 0:
+            self.length -= 1
+        else:
+            # The head may have wrapped around the ring onto the freed slot
+            self.cells[(self.head_index + self.length - 1) % self.capacity] = freed_tail
+            self.occupied[freed_tail] += 1
+        self.growing = freed_tail < 0  # Only a growing snake keeps its tail
+        if head == self._food[depth]:
+            self.score -= 1
+        self.food_cell = self._food[depth]
+        self.steps_without_food = self._steps_without_food[depth]
+        self.steps -= 1
+        self._body = None
+
+    def step(self, dx: int, dy: int) -> str:
+        """Play a move for good (it cannot be unmade); same outcomes as make()"""
+        outcome = self.make(dx, dy)
+        if self.listeners:
+            self._notify(outcome)
+        self.depth = 0
+        return outcome
+
+    def _notify(self, outcome: str) -> None:
+        """Send the listeners the events of the move step() just played"""
+        if outcome == WALL or outcome == SELF:
+            self.end(outcome)
+            return
+        freed_tail = self._freed_tail[self.depth - 1]
+        head_added = self.positions[self.head_cell()]
+        tail_removed = self.positions[freed_tail] if freed_tail >= 0 else None
+        for listener in self.listeners:
+            listener.on_step(head_added, tail_removed)
+        if outcome == MOVED:
+            return
+        for listener in self.listeners:
+            listener.on_grow()
+        if outcome == BOARD_FULL:
+            self.end(BOARD_FULL)
+            return
+        for listener in self.listeners:
+            listener.on_food_spawned(self.food)
+
+    def end(self, reason: str) -> None:
+        """End the game, telling the listeners why; only the first call counts"""
+        if self.over:
+            return
+        self.over = True
+        for listener in self.listeners:
+            listener.on_game_end(reason)
+
+    def place_food(self) -> bool:
+        """spawn_food() for callers outside step(), telling the listeners"""
+        placed = self.spawn_food()
+        if placed:
+            for listener in self.listeners:
+                listener.on_food_spawned(self.food)
+        return placed
+
+    def snapshot(self, buffer: Optional[EngineSnapshot] = None) -> EngineSnapshot:
+        """Copy the state into buffer (a new one if None) and return it"""
+        if buffer is None:
+            buffer = EngineSnapshot(self)
+        else:
+            buffer.cells[:] = self.cells
+            buffer.occupied[:] = self.occupied
+        buffer.scalars = (self.head_index, self.length, self.food_cell, self.growing,
+                          self.score, self.steps, self.steps_without_food)
+        return buffer
+
+    def restore(self, buffer: EngineSnapshot) -> None:
+        """Return to a snapshot; undo records made since are dropped"""
+        self.cells[:] = buffer.cells
+        self.occupied[:] = buffer.occupied
+        (self.head_index, self.length, self.food_cell, self.growing,
+         self.score, self.steps, self.steps_without_food) = buffer.scalars
+        self.depth = 0
+        self._body = None
+
+    def spawn_food(self) -> bool:
+        """Place food on a free cell, preferring cells more than
+        SPAWN_MIN_DISTANCE steps from the head; False (no food cell) when
+        the board is full"""
+        occupied = self.occupied
+        # Cover the cells near the head on a copy of the occupancy, then
+        # whatever is left uncovered is free and distant
+        covered = bytearray(occupied)
+        for cell in self.near_cells[self.head_cell()]:
+            covered[cell] = 1
+        candidates = [cell for cell in self.spawn_order if not covered[cell]]
+        if not candidates:
+            candidates = [cell for cell in self.spawn_order if not occupied[cell]]
+            if not candidates:
+                self.food_cell = NO_CELL
+                return False
+        self.food_cell = self.rng.choice(candidates)
+        return True
@@ -0,0 +1,66 @@
+from collections import deque
+from typing import Optional
+from src.utils.settings import (DEGRADE_AFTER, DEGRADE_WINDOW, RECOVER_AFTER,
+                                RECOVER_HEADROOM, RECOVER_MAX_BACKOFF)
+
+# Play modes of the live game, least degraded first
+FULL = "full"          # The chosen AI with its usual move budget
+REDUCED = "reduced"    # The chosen AI on a smaller budget
+FALLBACK = "fallback"  # A cheap AI standing in for the chosen one
+
+MODE_LABELS = {FULL: "Full search", REDUCED: "Reduced search", FALLBACK: "Fallback"}
+
+class FrameBudgetController:
+    """Decides when the live game should play a cheaper AI because the
+    chosen one keeps missing the frame, and when to go back to it.
+
+    record() takes how long each AI move took and the frame time (1 /
+    speed). DEGRADE_AFTER moves over the frame within the last
+    DEGRADE_WINDOW step down one mode, from FULL to REDUCED to FALLBACK;
+    RECOVER_AFTER moves in a row using at most RECOVER_HEADROOM of the
+    frame step back up one. Every step down doubles the wait before the
+    next step up (to at most RECOVER_MAX_BACKOFF times), so an AI that
+    only keeps up while degraded doesn't flip back and forth all game.
+    Game applies the modes; this only keeps count.
+    """
+
+    def __init__(self, can_fall_back: bool = True, degrade_after: int = DEGRADE_AFTER,
+                 window: int = DEGRADE_WINDOW, recover_after: int = RECOVER_AFTER,
+                 headroom: float = RECOVER_HEADROOM):
+        # Without a fallback (the chosen AI is the fallback) REDUCED is as low as it goes
+        self.modes = (FULL, REDUCED, FALLBACK) if can_fall_back else (FULL, REDUCED)
+        self.degrade_after = degrade_after
+        self.recover_after = recover_after
+        self.headroom = headroom
+        self.missed = deque(maxlen=window)  # Whether each recent move missed the frame
+        self.reset()
+
+    def reset(self) -> None:
+        """Back to FULL with no history, for a new game"""
+        self.level = 0
+        self.missed.clear()
+        self.fast_moves = 0  # Moves in a row with headroom
+        self.patience = self.recover_after  # Moves with headroom needed to step up
+
+    @property
+    def mode(self) -> str:
+        return self.modes[self.level]
+
+    def record(self, latency: float, frame: float) -> Optional[str]:
+        """Count one move that took latency seconds of a frame seconds
+        long frame; returns the new mode when it changes, else None"""
+        over = latency > frame
+        self.missed.append(over)
+        self.fast_moves = self.fast_moves + 1 if latency <= frame * self.headroom else 0
+
+        if over and sum(self.missed) >= self.degrade_after and self.level < len(self.modes) - 1:
+            self.level += 1
+            self.missed.clear()
+            self.patience = min(self.patience * 2, self.recover_after * RECOVER_MAX_BACKOFF)
+            return self.mode
+        if self.fast_moves >= self.patience and self.level > 0:
+            self.level -= 1
+            self.fast_moves = 0
+            self.missed.clear()
+            return self.mode
+        return None
@@ -2,7 +2,10 @@ import pygame
 import time
 import logging
 import traceback
-from src.utils.settings import WINDOW_SIZE, FPS, GRID_SIZE
+from src.utils.settings import (WINDOW_SIZE, FPS, GRID_SIZE, AI_MOVE_BUDGET_FRACTION,
+                                DEGRADE_FALLBACK_AI, REDUCED_BUDGET_FRACTION, REDUCED_MAX_NODES)
+from src.game.engine import Engine, NO_CELL
+from src.game.frame_budget import FrameBudgetController, REDUCED, FALLBACK, MODE_LABELS
 from src.game.snake import Snake
 from src.game.food import Food
 from src.utils.input_handler import InputHandler
@@ -11,10 +14,9 @@ from src.game.game_state import GameState
 from src.ui.game_stats import GameStats
 from src.ai import AI_ALGORITHMS
 import os
-import random
 
 class Game:
-    def __init__(self, start_with_ai=False, ai_algorithm="astar", speed=10, headless=False, genetic_individual=None, max_steps_multiplier=1, color_scheme="blue"):
+    def __init__(self, start_with_ai=False, ai_algorithm="astar", speed=10, headless=False, genetic_individual=None, max_steps_multiplier=1, color_scheme="blue", move_budget=None, ai=None):
         # Set SDL to use dummy video driver for headless mode
         if headless:
             os.environ["SDL_VIDEODRIVER"] = "dummy"
@@ -24,7 +26,10 @@ class Game:
         
         self.headless = headless
         self.moves = 0  # Track number of moves for genetic fitness
+        self.end_reason = None  # Why the last headless run ended
         self.max_steps_multiplier = max_steps_multiplier
+        self.move_budget = move_budget  # Seconds per AI move; None derives it from FPS when rendering
+        self.truncated_moves = 0  # AI moves cut short by the budget
         
         if not self.headless:
             self.screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
@@ -36,11 +41,12 @@ class Game:
             self.screen = pygame.Surface((WINDOW_SIZE, WINDOW_SIZE))
             self.clock = pygame.time.Clock()
         
-        # Initialize components
-        self.snake = Snake()
-        self.food = Food()
+        # Initialize components, all views over one engine
+        self.engine = Engine()
+        self.snake = Snake(self.engine)
+        self.food = Food(self.engine)
         self.input_handler = InputHandler()
-        self.game_state = GameState()
+        self.game_state = GameState(self.engine)
         
         # Game flow control
         self.is_running = True
@@ -49,12 +55,23 @@ class Game:
         self.is_paused = False
         self.last_update_time = time.time()
         
+        # The live loop steps down to a cheaper AI (or search) when moves miss the frame
+        self.frame_budget = FrameBudgetController(can_fall_back=ai_algorithm != DEGRADE_FALLBACK_AI)
+        self.primary_ai = None  # The AI chosen to play, whatever stands in for it now
+        self.fallback_ai = None  # Built the first time it is needed
+        
         # Set initial control mode and AI algorithm
         if start_with_ai:
             if genetic_individual:
                 self.input_handler.set_genetic_individual(genetic_individual)
+            # An AI kept from an earlier game skips building one (and its tables) again
+            self.input_handler.set_ai_instance(ai)
             self.input_handler.current_ai_name = ai_algorithm
             self.input_handler.set_control_type("ai")
+            self.primary_ai = self.input_handler.current_ai
+            self._apply_move_budget()
+            self._listen(self.engine)
+            self.engine.reset()  # Start the game again, this time with the AI listening
             
             if not self.headless:
                 # Create stats window for AI mode with callbacks
@@ -63,14 +80,21 @@ class Game:
                     speed_callback=self.on_speed_change,
                     pause_callback=self.on_pause_toggle
                 )
+            else:
+                self.stats_window = None
         else:
             self.input_handler.set_control_type("human")
             self.stats_window = None
 
     def reset_game(self):
-        self.snake = Snake()
-        self.food = Food()
+        self.frame_budget.reset()
+        if self.primary_ai is not None:
+            # A new game starts with the chosen AI, even if a fallback finished the last one
+            self.input_handler.current_ai = self.primary_ai
+            self._apply_move_budget()
+        self._listen(self.engine)
         self.game_state.reset()
+        self.snake = Snake(self.engine)
         self.last_update_time = time.time()
         if self.stats_window:
             self.stats_window.reset()
@@ -98,14 +122,76 @@ class Game:
                 elif not self.is_paused:  # Only handle movement when not paused
                     self.input_handler.handle_input(event, self.snake, self.food)
 
+    def _listen(self, engine):
+        """Have the current AI hear engine's events, from its next reset on"""
+        ai = self.input_handler.current_ai
+        engine.listeners = [ai] if ai else []
+
+    def _apply_move_budget(self):
+        """Give the AI its per-move deadline: the configured one, or a share of the frame when rendering.
+        In reduced mode it gets a fraction of that and a node cap as well."""
+        budget = self.move_budget
+        if budget is None and not self.headless:
+            budget = AI_MOVE_BUDGET_FRACTION / self.current_speed
+        max_nodes = None
+        if self.frame_budget.mode == REDUCED:
+            if budget is not None:
+                budget *= REDUCED_BUDGET_FRACTION
+            max_nodes = REDUCED_MAX_NODES
+        self.input_handler.set_move_budget(budget, max_nodes)
+
+    def play_mode_label(self) -> str:
+        """How the AI is playing right now, for the stats window"""
+        mode = self.frame_budget.mode
+        if mode == FALLBACK:
+            return f"{MODE_LABELS[mode]} ({DEGRADE_FALLBACK_AI})"
+        return MODE_LABELS[mode]
+
+    def _track_move_time(self, latency: float, frame: float) -> None:
+        """Tell the frame-budget controller how long the AI's move took, and
+        switch to the mode it picks when it changes"""
+        mode = self.frame_budget.record(latency, frame)
+        if mode is None:
+            return
+        ai = self.primary_ai
+        if mode == FALLBACK:
+            if self.fallback_ai is None:
+                self.fallback_ai = AI_ALGORITHMS[DEGRADE_FALLBACK_AI]()
+            ai = self.fallback_ai
+        if ai is not self.input_handler.current_ai:
+            # The AI taking over hasn't been following the game, so it starts from the board as it is
+            self.input_handler.current_ai = ai
+            self.input_handler.current_path = []
+            ai.reset(self.engine)
+            self._listen(self.engine)
+        self._apply_move_budget()
+        logging.info(f"AI move took {latency * 1000:.1f} ms of a {frame * 1000:.0f} ms frame; "
+                     f"now playing: {self.play_mode_label()}")
+
     def on_speed_change(self, new_speed):
         self.current_speed = new_speed
+        self._apply_move_budget()
     
     def on_pause_toggle(self, is_paused):
         self.is_paused = is_paused
         if not is_paused:
             self.last_update_time = time.time()  # Reset update time when unpausing
 
+    def step(self) -> bool:
+        """Play one move by the game rules; returns False when it ends the game"""
+        # Handle AI input if in AI mode
+        if self.input_handler.control_type == "ai":
+            self.input_handler.handle_input(None, self.snake, self.food)
+            ai = self.input_handler.current_ai
+            if ai and ai.truncated:
+                self.truncated_moves += 1
+        
+        # Update snake position (and eat) and check for game over
+        if not self.snake.move():
+            self.game_state.game_over = True
+            return False
+        return True
+
     def update(self):
         current_time = time.time()
         update_interval = 1.0 / self.current_speed
@@ -113,24 +199,19 @@ class Game:
         if not self.game_state.game_over and not self.is_paused:
             # Only update if enough time has passed
             if current_time - self.last_update_time >= update_interval:
-                # Handle AI input if in AI mode
+                started = time.perf_counter()
+                alive = self.step()
                 if self.input_handler.control_type == "ai":
-                    self.input_handler.handle_input(None, self.snake, self.food)
-                
-                # Update snake position and check for game over
-                if not self.snake.move():
-                    self.game_state.game_over = True
-                else:
-                    # Update game state (food collection, etc)
-                    self.game_state.update(self.snake, self.food)
-                    
+                    self._track_move_time(time.perf_counter() - started, update_interval)
+                if alive:
                     # Update stats window if it exists
                     if self.stats_window:
                         self.stats_window.update_stats(
                             self.game_state.score,
                             self.snake.get_turns(),
                             len(self.snake.body),
-                            GRID_SIZE
+                            GRID_SIZE,
+                            mode=self.play_mode_label()
                         )
                 
                 self.last_update_time = current_time
@@ -159,132 +240,105 @@ class Game:
             pygame.display.flip()
             self.clock.tick(60)
 
-    def run_headless(self):
-        """Run the game without rendering for simulation purposes"""
+    def run_headless(self, max_steps=None):
+        """Play one game without rendering for training and simulations;
+        returns the episode stats of run_normal_headless"""
         # Ensure AI is initialized
         if not self.input_handler.current_ai and self.input_handler.current_ai_name:
             ai_class = AI_ALGORITHMS[self.input_handler.current_ai_name]
             self.input_handler.current_ai = ai_class()
-            
-        if self.headless:
-            return self.run_fast_simulation()
-        else:
-            # For single AI games, use normal rendering
-            return self.run()
-
-    def run_fast_simulation(self):
-        """Ultra-fast simulation without pygame or rendering"""
-        score = 0
-        snake_body = [(GRID_SIZE // 2, GRID_SIZE // 2)]  # Start in middle
-        food_pos = (GRID_SIZE - 5, GRID_SIZE - 5)  # Initial food position
-        growing = False
+            self._apply_move_budget()
         
-        try:
-            while True:  # Run until snake dies or can't continue
-                # Get AI's next move using the current_ai instance
-                if not self.input_handler.current_ai:
-                    raise Exception("No AI algorithm initialized")
-                    
-                dx, dy = self.input_handler.current_ai.get_next_move(
-                    snake_body[0],  # snake head
-                    food_pos,       # food position
-                    snake_body      # full snake body
-                )
-                
-                # Calculate new head position
-                new_head = (snake_body[0][0] + dx, snake_body[0][1] + dy)
-                
-                # Check wall collision
-                if not (0 <= new_head[0] < GRID_SIZE and 0 <= new_head[1] < GRID_SIZE):
-                    break
-                
-                # Check self collision (excluding tail if not growing)
-                if new_head in snake_body[:-1] or (new_head in snake_body and not growing):
-                    break
-                
-                # Move snake
-                snake_body.insert(0, new_head)
-                if not growing:
-                    snake_body.pop()
-                growing = False
-                
-                # Check food collision
-                if new_head == food_pos:
-                    score += 1
-                    growing = True
-                    
-                    # Generate new food position
-                    available_positions = [
-                        (x, y) for x in range(GRID_SIZE) for y in range(GRID_SIZE)
-                        if (x, y) not in snake_body
-                    ]
-                    if available_positions:
-                        # Try to place food away from snake head
-                        distant_positions = [
-                            pos for pos in available_positions
-                            if abs(pos[0] - new_head[0]) + abs(pos[1] - new_head[1]) > 3
-                        ]
-                        food_pos = random.choice(distant_positions if distant_positions else available_positions)
-                    else:
-                        break  # No space left for food
-            
-            return score
-            
-        except Exception as e:
-            logging.error(f"Error in fast simulation: {str(e)}")
-            logging.error(traceback.format_exc())
-            return score
+        return self.run_normal_headless(max_steps, max_steps_without_food=GRID_SIZE * GRID_SIZE * 2)
 
-    def run_normal_headless(self):
-        """Original headless mode with pygame (slower but more accurate)"""
+    def run_normal_headless(self, max_steps=None, max_steps_without_food=None):
+        """Play the game on the real Snake, Food and GameState objects, with
+        the interactive rules (step) but no rendering or frame timing.
+        
+        Ends on a collision, after max_steps moves (4 times the grid area
+        times max_steps_multiplier by default) or after max_steps_without_food
+        moves without eating (3 grid widths by default). The body is also
+        tracked with a rolling hash; if a deterministic AI repeats an exact
+        position without having eaten in between, it is going round in a
+        loop and the game ends at once. Returns the episode stats: score,
+        steps, turns, length, truncated_moves and death_cause, one of
+        "wall", "self", "looped", "starved", "max_steps" or "board_full".
+        The moves made are also left in self.moves and the death cause in
+        self.end_reason.
+        """
         logging.debug("Starting headless game run")
         
-        # Calculate max steps based on grid size and multiplier
-        base_max_steps = GRID_SIZE * GRID_SIZE * 4  # Base max steps is 4 times the grid area
-        max_steps = base_max_steps * self.max_steps_multiplier
+        if max_steps is None:
+            max_steps = GRID_SIZE * GRID_SIZE * 4 * self.max_steps_multiplier
+        if max_steps_without_food is None:
+            max_steps_without_food = GRID_SIZE * 3
+        engine = self.engine
         steps = 0
         steps_without_food = 0  # Track steps without eating food
-        max_steps_without_food = GRID_SIZE * 3  # Maximum steps allowed without eating
+        death_cause = "max_steps"
+        
+        # Polynomial hash of the body cells, head first: sum of cell_i * base^i.
+        # Food only moves when eaten, so between meals this is the whole state.
+        base, modulus = GRID_SIZE * GRID_SIZE + 1, (1 << 61) - 1
+        state_hash = engine.head_cell() % modulus
+        tail_power = 1  # base^(length - 1)
+        seen_states = {state_hash}
         
         try:
-            while not self.game_state.game_over and steps < max_steps:
-                # Handle AI input
-                self.input_handler.handle_input(None, self.snake, self.food)
-                
-                # Update game state
-                if not self.snake.move():
-                    logging.debug(f"Game over: Snake collision at step {steps}")
-                    self.game_state.game_over = True
-                else:
-                    old_score = self.game_state.score
-                    self.game_state.update(self.snake, self.food)
-                    
-                    # Check if food was eaten
-                    if self.game_state.score > old_score:
-                        steps_without_food = 0
-                        # Spawn food away from current position
-                        self.food.spawn(self.snake.body)
-                    else:
-                        steps_without_food += 1
-                        
-                        # End game if snake hasn't eaten for too long
-                        if steps_without_food >= max_steps_without_food:
-                            logging.debug(f"Game over: No food eaten for {steps_without_food} steps")
-                            self.game_state.game_over = True
-                
+            while steps < max_steps:
+                old_score = self.game_state.score
+                growing, tail = engine.growing, engine.tail_cell()
+                alive = self.step()
                 steps += 1
                 self.moves = steps
                 
-                # Maintain consistent game speed
-                self.clock.tick(self.current_speed)
+                if not alive:
+                    death_cause = self.snake.collision
+                    logging.debug(f"Game over: Snake collision at step {steps}")
+                    break
+                
+                if growing:
+                    tail_power = tail_power * base % modulus
+                else:
+                    state_hash -= tail * tail_power
+                state_hash = (state_hash * base + engine.head_cell()) % modulus
                 
-                if steps >= max_steps:
-                    logging.debug("Game reached maximum steps")
+                if self.game_state.score > old_score:
+                    steps_without_food = 0
+                    seen_states.clear()  # Positions before this meal cannot come back
+                    if engine.food_cell == NO_CELL:
+                        death_cause = "board_full"
+                        break
+                else:
+                    steps_without_food += 1
+                    # A repeated position is no loop for an AI that draws random numbers
+                    ai = self.input_handler.current_ai
+                    if ai and ai.deterministic:
+                        if state_hash in seen_states:
+                            logging.debug(f"Game over: Looped at step {steps}")
+                            death_cause = "looped"
+                            break
+                        seen_states.add(state_hash)
+                    # End game if snake hasn't eaten for too long
+                    if steps_without_food >= max_steps_without_food:
+                        logging.debug(f"Game over: No food eaten for {steps_without_food} steps")
+                        death_cause = "starved"
+                        break
             
+            self.game_state.game_over = True
+            self.end_reason = death_cause
+            engine.end(death_cause)
             logging.debug(f"Headless game completed. Score: {self.game_state.score}, Steps: {steps}")
-            return self.game_state.score
+            return {
+                'score': self.game_state.score,
+                'steps': steps,
+                'turns': self.snake.get_turns(),
+                'length': len(self.snake.body),
+                'truncated_moves': self.truncated_moves,
+                'death_cause': death_cause
+            }
             
         except Exception as e:
             logging.error(f"Error in headless game: {str(e)}")
             logging.error(traceback.format_exc())
-            raise
\ No newline at end of file
+            raise
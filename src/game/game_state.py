@@ -1,22 +1,17 @@
-from typing import TYPE_CHECKING
-if TYPE_CHECKING:
-    from .snake import Snake
-    from .food import Food
+from typing import Optional
+from src.game.engine import Engine
 
 class GameState:
-    def __init__(self):
-        self.score = 0
+    def __init__(self, engine: Optional[Engine] = None):
+        self.engine = engine if engine is not None else Engine()
         self.game_over = False
     
-    def update(self, snake: 'Snake', food: 'Food') -> None:
-        """Update game state based on snake and food positions"""
-        # Check if snake ate food
-        if snake.body[0] == food.position:
-            self.score += 1
-            snake.grow()
-            food.spawn(snake.body)
+    @property
+    def score(self) -> int:
+        """Food eaten, as counted by the engine"""
+        return self.engine.score
     
     def reset(self) -> None:
         """Reset game state to initial values"""
-        self.score = 0
-        self.game_over = False
\ No newline at end of file
+        self.engine.reset()
+        self.game_over = False
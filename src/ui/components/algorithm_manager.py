@@ -19,6 +19,8 @@ class AlgorithmManager:
             ("🧠 Smart Hybrid", "smart_hybrid", "Combines A* and Wall Following adaptively"),
             ("🔬 Reverse A*", "reverse_astar", "Finds longest valid path to food"),
             ("🌟 Smarter Hybrid", "smarter_hybrid", "Enhanced hybrid combining A*, Hamiltonian, and advanced path analysis"),
+            ("🎯 Expectimax", "expectimax", "Searches ahead over moves and possible food spawns"),
+            ("🌳 Monte Carlo Tree Search", "mcts", "Random playouts guide each move"),
         ]
         
         self.algorithms_scroll = None
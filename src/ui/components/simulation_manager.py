@@ -11,11 +11,12 @@ BACKGROUND_COLOR = (15, 15, 15)  # Very dark grey, almost black
 GRID_COLOR = (25, 25, 25)  # Slightly lighter than background for subtle grid lines
 
 class SimulationManager:
-    def __init__(self, parent):
+    def __init__(self, parent, algorithms=None, num_simulations=0, move_budget=None):
         self.window = tk.Toplevel(parent)
         self.window.protocol("WM_DELETE_WINDOW", self.on_closing)
-        self.algorithms = []
-        self.num_simulations = 0
+        self.algorithms = algorithms or []
+        self.num_simulations = num_simulations
+        self.move_budget = move_budget  # Seconds per AI move, None for unlimited
         self.result_queue = queue.Queue()
         self.simulation_results = {}
     
@@ -36,7 +37,8 @@ class SimulationManager:
                     'avg': 0,
                     'max': 0,
                     'std': 0,
-                    'failed_runs': 0
+                    'failed_runs': 0,
+                    'truncated_moves': 0
                 }
             
             # Report initial progress
@@ -48,15 +50,18 @@ class SimulationManager:
                 # Get the existing results dictionary
                 results = self.simulation_results[algo_name]
                 failed_runs = 0
+                ai = None  # Built by the first game, then reset and replayed by the rest
                 
                 for i in range(self.num_simulations):
                     try:
-                        # Create game instance with fast simulation settings
+                        # Create a headless game instance
                         game_settings = {
                             'start_with_ai': True,
                             'ai_algorithm': algo_id,
                             'headless': True,
-                            'max_steps_multiplier': 5
+                            'max_steps_multiplier': 5,
+                            'move_budget': self.move_budget,
+                            'ai': ai
                         }
                         
                         # Adjust settings for specific algorithms
@@ -64,7 +69,10 @@ class SimulationManager:
                             game_settings['max_steps_multiplier'] = 10
                         
                         game = Game(**game_settings)
-                        score = game.run_headless()  # This will use fast simulation
+                        ai = game.input_handler.current_ai
+                        stats = game.run_headless()
+                        score = stats['score']
+                        results['truncated_moves'] += stats['truncated_moves']
                         
                         if score > 0:  # Only count non-zero scores
                             results['scores'].append(score)
@@ -1,52 +1,197 @@
 import logging
 import traceback
+import random
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Tuple, Dict
+from src.ai.genetic import GeneticAI, GENE_NAMES
 from src.ai.genetic_population import GeneticPopulation
 from src.game.game import Game
+from src.utils.settings import GRID_SIZE, MIGRANTS, MIGRATION_INTERVAL, TRAINING_ISLANDS
 import json
 import os
 from datetime import datetime
 
+def evaluate_weights(weights: List[float], seed: int, max_steps: int) -> Tuple[int, int]:
+    """Play one headless game as a GeneticAI with the given weight vector
+    (GENE_NAMES order); returns (score, moves). Runs in worker processes,
+    so it takes and returns plain values only."""
+    random.seed(seed)
+    individual = GeneticAI(weights=dict(zip(GENE_NAMES, weights)))
+    game = Game(
+        start_with_ai=True,
+        ai_algorithm="genetic",
+        speed=30,
+        headless=True,
+        genetic_individual=individual
+    )
+    stats = game.run_headless(max_steps)
+    return stats['score'], stats['steps']
+
+def evaluate_episodes(weights: List[float], seeds: List[int], max_steps: int) -> List[Tuple[int, int]]:
+    """(score, moves) of one game per seed, as one worker task"""
+    return [evaluate_weights(weights, seed, max_steps) for seed in seeds]
+
+def run_island(island, settings, seed, inbox, outbox, reports):
+    """Evolve one island of an island-model run in its own process.
+    
+    Every migration_interval generations the island sends copies of its
+    best individuals to the next island and takes in whatever has arrived
+    from the previous one, without waiting for it. After each generation
+    it reports ('generation', island, stats, best fitness, best weights);
+    it ends with ('done', island) or ('error', island, message).
+    """
+    try:
+        random.seed(seed)
+        trainer = TrainingManager(workers=1, islands=1, **settings)
+        population = GeneticPopulation(population_size=trainer.population_size)
+        trainer.genetic_population = population
+        for generation in range(trainer.generation_limit):
+            trainer.evaluate_population(None, generation, lambda progress: None)
+            
+            if (generation + 1) % trainer.migration_interval == 0:
+                outbox.put(population.emigrants(trainer.migrants))
+                try:
+                    while True:
+                        population.immigrate(*inbox.get_nowait())
+                except queue.Empty:
+                    pass
+            
+            population.evolve()
+            best = population.best_individual.weight_vector() if population.best_individual else None
+            reports.put(('generation', island, population.generation_stats[-1], population.best_fitness, best))
+        reports.put(('done', island))
+    except Exception as e:
+        logging.error(traceback.format_exc())
+        reports.put(('error', island, str(e)))
+    finally:
+        outbox.cancel_join_thread()  # The next island may have stopped reading
+
 class TrainingManager:
-    def __init__(self, population_size, generation_limit):
+    def __init__(self, population_size, generation_limit, workers=None, episodes=3, reseed_interval=5,
+                 rungs=3, promote_fraction=1 / 3, islands=TRAINING_ISLANDS,
+                 migration_interval=MIGRATION_INTERVAL, migrants=MIGRANTS):
         self.population_size = population_size
         self.generation_limit = generation_limit
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.max_steps = GRID_SIZE * GRID_SIZE * 4  # Same cap as run_normal_headless
+        self.episodes = episodes                # Games per individual, averaged into its fitness
+        self.reseed_interval = reseed_interval  # Generations that share one set of game seeds
+        self.seeds: Tuple[int, ...] = ()
+        # Fitness by (weight vector bytes, seeds), so unchanged elites are not replayed
+        self.fitness_cache: Dict[Tuple[bytes, Tuple[int, ...]], float] = {}
+        # Successive halving: every individual plays the shortest step budget,
+        # the best promote_fraction go on to the next one, up to max_steps
+        self.rungs = rungs
+        self.promote_fraction = promote_fraction
+        self.games_played = 0
+        self.moves_played = 0
+        self.cache_hits = 0
+        # Island model: more than one island splits the population across
+        # processes that evolve independently and trade their best
+        # individuals every migration_interval generations
+        self.islands = islands
+        self.migration_interval = migration_interval
+        self.migrants = migrants
         self.genetic_population = None
         self.best_individual = None
         self.generation_stats = []
     
+    def rung_steps(self) -> List[int]:
+        """Step budget of each successive-halving rung, shortest first"""
+        return [max(1, round(self.max_steps * self.promote_fraction ** (self.rungs - 1 - rung)))
+                for rung in range(self.rungs)]
+    
+    def play(self, pool, candidates, seeds, max_steps):
+        """Yield (key, [(score, moves), ...]) for each (key, weights)
+        candidate as its games finish"""
+        if pool is None:
+            for key, weights in candidates:
+                yield key, evaluate_episodes(weights, seeds, max_steps)
+        else:
+            futures = {pool.submit(evaluate_episodes, weights, seeds, max_steps): key
+                       for key, weights in candidates}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    
+    def evaluate_population(self, pool, generation, progress_callback):
+        """Score every individual on the same set of games (common random
+        numbers, so differences come from the weights rather than the food
+        luck), spread over the worker pool.
+        
+        Games are raced by successive halving: everyone plays a short step
+        budget and only the best promote_fraction are replayed with a longer
+        one, so looping or hopeless weights stop early. A capped game's
+        score and moves only grow with the budget, so an individual dropped
+        at a rung never outranks one promoted past it and evolve can sort
+        the partial and full fitness values together.
+        
+        Full-budget results are cached, and the seeds only change every
+        reseed_interval generations, so elites and duplicate children are
+        not replayed.
+        """
+        if generation % self.reseed_interval == 0 or not self.seeds:
+            self.seeds = tuple(random.getrandbits(32) for _ in range(self.episodes))
+            self.fitness_cache.clear()
+        
+        population = self.genetic_population
+        keys = [(row.tobytes(), self.seeds) for row in population.genes]
+        weights: Dict[Tuple[bytes, Tuple[int, ...]], List[float]] = {}  # Rows sharing a weight vector play once
+        for index, key in enumerate(keys):
+            if key in self.fitness_cache:
+                self.cache_hits += 1
+            elif key not in weights:
+                weights[key] = population.genes[index].tolist()
+        
+        seeds = list(self.seeds)
+        fitness = dict(self.fitness_cache)
+        racing = list(weights)
+        budgets = self.rung_steps()
+        for rung, max_steps in enumerate(budgets):
+            for done, (key, results) in enumerate(self.play(pool, [(key, weights[key]) for key in racing],
+                                                            seeds, max_steps), 1):
+                self.games_played += len(results)
+                self.moves_played += sum(moves for _, moves in results)
+                fitness[key] = sum(GeneticAI.game_fitness(score, moves) for score, moves in results) / len(results)
+                progress = (generation + (rung + done / len(racing)) / len(budgets)) / self.generation_limit * 100
+                progress_callback(progress)
+            if rung == len(budgets) - 1:
+                self.fitness_cache.update((key, fitness[key]) for key in racing)
+            else:
+                racing.sort(key=lambda key: fitness[key], reverse=True)
+                racing = racing[:max(1, round(len(racing) * self.promote_fraction))]
+        
+        for index, key in enumerate(keys):
+            population.set_fitness(index, fitness[key])
+    
     def start_training(self, progress_callback):
         """
         Run genetic algorithm training
         progress_callback: function to call with progress updates (0-100)
         """
+        pool = None
         try:
+            if self.islands > 1:
+                return self.train_islands(progress_callback)
+            
             self.genetic_population = GeneticPopulation(population_size=self.population_size)
+            if self.workers > 1:
+                pool = ProcessPoolExecutor(max_workers=self.workers)
             
             for generation in range(self.generation_limit):
                 # Train each individual in the population
-                for i in range(self.genetic_population.population_size):
-                    individual = self.genetic_population.population[i]
-                    game = Game(
-                        start_with_ai=True,
-                        ai_algorithm="genetic",
-                        speed=30,
-                        headless=True,
-                        genetic_individual=individual
-                    )
-                    score = game.run_headless()
-                    individual.update_fitness(score, game.moves)
+                self.evaluate_population(pool, generation, progress_callback)
                 
                 # Evolve population
                 self.genetic_population.evolve()
                 
-                # Update progress
-                progress = ((generation + 1) / self.generation_limit) * 100
-                progress_callback(progress)
-                
                 # Store generation info
                 info = self.genetic_population.get_generation_info()
                 self.generation_stats.append(info)
-                logging.info(f"Generation {info['generation']}: Best Fitness = {info['best_fitness_ever']}")
+                logging.info(f"Generation {info['generation']}: Best Fitness = {info['best_fitness_ever']} "
+                             f"({self.games_played} games and {self.moves_played} moves played, "
+                             f"{self.cache_hits} cached evaluations)")
             
             self.best_individual = self.genetic_population.best_individual
             return ("success", self.generation_stats)
@@ -55,6 +200,95 @@ class TrainingManager:
             logging.error(f"Training error: {str(e)}")
             logging.error(traceback.format_exc())
             return ("error", str(e))
+        
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+    
+    def train_islands(self, progress_callback):
+        """Island-model training, one process per island in a ring.
+        
+        Islands never wait for each other; this process only collects their
+        reports. genetic_population becomes a summary of the run: the
+        best-ever individual over all islands and, per generation, the best
+        and average fitness across islands.
+        """
+        settings = {
+            'population_size': max(5, self.population_size // self.islands),
+            'generation_limit': self.generation_limit,
+            'episodes': self.episodes,
+            'reseed_interval': self.reseed_interval,
+            'rungs': self.rungs,
+            'promote_fraction': self.promote_fraction,
+            'migration_interval': self.migration_interval,
+            'migrants': self.migrants
+        }
+        summary = GeneticPopulation(population_size=0)
+        summary.population_size = settings['population_size'] * self.islands
+        self.genetic_population = summary
+        
+        inboxes = [multiprocessing.Queue() for _ in range(self.islands)]
+        reports = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=run_island,
+                args=(island, settings, random.getrandbits(32), inboxes[island],
+                      inboxes[(island + 1) % self.islands], reports),
+                daemon=True
+            )
+            for island in range(self.islands)
+        ]
+        for process in processes:
+            process.start()
+        
+        pending: Dict[int, List[Dict]] = {}  # Island stats of generations not every island has finished
+        running, reported = self.islands, 0
+        try:
+            while running:
+                try:
+                    message = reports.get(timeout=1)
+                except queue.Empty:
+                    if any(process.exitcode not in (None, 0) for process in processes):
+                        raise RuntimeError("An island process died")
+                    continue
+                
+                kind, island = message[0], message[1]
+                if kind == 'error':
+                    raise RuntimeError(f"Island {island}: {message[2]}")
+                if kind == 'done':
+                    running -= 1
+                    continue
+                
+                stats, best_fitness, best_weights = message[2:]
+                if best_weights is not None and best_fitness > summary.best_fitness:
+                    summary.best_fitness = best_fitness
+                    summary.best_individual = GeneticAI(weights=dict(zip(GENE_NAMES, best_weights)))
+                
+                reported += 1
+                progress_callback(reported / (self.islands * self.generation_limit) * 100)
+                
+                generation = stats['generation']
+                pending.setdefault(generation, []).append(stats)
+                if len(pending[generation]) == self.islands:
+                    island_stats = pending.pop(generation)
+                    summary.generation_stats.append({
+                        'generation': generation,
+                        'best_fitness': max(stat['best_fitness'] for stat in island_stats),
+                        'avg_fitness': sum(stat['avg_fitness'] for stat in island_stats) / self.islands
+                    })
+                    summary.generation = generation + 1
+                    info = summary.get_generation_info()
+                    self.generation_stats.append(info)
+                    logging.info(f"Generation {info['generation']}: Best Fitness = {info['best_fitness_ever']} "
+                                 f"({self.islands} islands)")
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+        
+        self.best_individual = summary.best_individual
+        return ("success", self.generation_stats)
     
     def save_model(self):
         """Save the trained model"""
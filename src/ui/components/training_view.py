@@ -8,6 +8,7 @@ from datetime import datetime
 import threading
 import numpy as np
 import traceback
+from src.utils.settings import MIGRANTS, MIGRATION_INTERVAL, TRAINING_ISLANDS
 
 class TrainingView:
     def __init__(self, parent, dialog_manager, algorithm_manager):
@@ -18,6 +19,9 @@ class TrainingView:
         # Training variables
         self.population_size = ctk.IntVar(value=50)
         self.generation_limit = ctk.IntVar(value=20)
+        self.islands = ctk.IntVar(value=TRAINING_ISLANDS)
+        self.migration_interval = ctk.IntVar(value=MIGRATION_INTERVAL)
+        self.migrants = ctk.IntVar(value=MIGRANTS)
         
         # Create training frame
         self.training_frame = self._create_training_frame()
@@ -58,6 +62,34 @@ class TrainingView:
         )
         gen_frame.pack(fill="x", pady=5)
         
+        # Island model: populations in separate processes trading their best
+        islands_frame = self._create_setting_frame(
+            settings_container,
+            "Islands",
+            self.islands,
+            1, 8,
+            self._update_islands_label
+        )
+        islands_frame.pack(fill="x", pady=5)
+        
+        migration_frame = self._create_setting_frame(
+            settings_container,
+            "Migration Interval",
+            self.migration_interval,
+            1, 20,
+            self._update_migration_label
+        )
+        migration_frame.pack(fill="x", pady=5)
+        
+        migrants_frame = self._create_setting_frame(
+            settings_container,
+            "Migrants",
+            self.migrants,
+            1, 5,
+            self._update_migrants_label
+        )
+        migrants_frame.pack(fill="x", pady=5)
+        
         return frame
     
     def _create_setting_frame(self, parent, label_text, variable, from_, to, callback):
@@ -87,6 +119,15 @@ class TrainingView:
     def _update_gen_label(self, label, value):
         label.configure(text=f"Generation Limit: {int(float(value))}")
     
+    def _update_islands_label(self, label, value):
+        label.configure(text=f"Islands: {int(float(value))}")
+    
+    def _update_migration_label(self, label, value):
+        label.configure(text=f"Migration Interval: {int(float(value))}")
+    
+    def _update_migrants_label(self, label, value):
+        label.configure(text=f"Migrants: {int(float(value))}")
+    
     def show_training_results(self, genetic_population):
         results_window = ctk.CTkToplevel(self.parent)
         results_window.title("Training Results")
@@ -26,6 +26,7 @@ class GameStats:
         self.cells_traveled = tk.StringVar(value="0")
         self.efficiency = tk.StringVar(value="0.00%")
         self.time_elapsed = tk.StringVar(value="0:00")
+        self.mode = tk.StringVar(value="Full search")  # How the AI is playing (see Game.play_mode_label)
         self.highest_score = 0
         self.start_time = time.time()
         
@@ -76,6 +77,21 @@ class GameStats:
                 text=self.algorithm_name,
                 style='Stats.TLabel'
             ).pack(anchor=tk.W)
+            
+            mode_frame = ttk.Frame(algo_frame)
+            mode_frame.pack(fill=tk.X)
+            
+            ttk.Label(
+                mode_frame,
+                text="Mode:",
+                style='Header.TLabel'
+            ).pack(side=tk.LEFT)
+            
+            ttk.Label(
+                mode_frame,
+                textvariable=self.mode,
+                style='Stats.TLabel'
+            ).pack(side=tk.RIGHT)
         
         # Stats Section
         stats_frame = ttk.LabelFrame(container, text="Performance", padding=10)
@@ -176,10 +192,14 @@ class GameStats:
         if self.pause_callback:
             self.pause_callback(self.pause_var.get())
     
-    def update_stats(self, score, turns, length, grid_size):
+    def update_stats(self, score, turns, length, grid_size, mode=None):
         # Update basic stats
         self.score.set(str(score))
         
+        # Update the AI's play mode, when the game reports one
+        if mode is not None:
+            self.mode.set(mode)
+        
         # Update turns (direction changes)
         self.turns.set(str(turns))
         
@@ -417,7 +417,10 @@ class GameLauncher:
         """Start genetic algorithm training"""
         trainer = TrainingManager(
             population_size=self.training_view.population_size.get(),
-            generation_limit=self.training_view.generation_limit.get()
+            generation_limit=self.training_view.generation_limit.get(),
+            islands=self.training_view.islands.get(),
+            migration_interval=self.training_view.migration_interval.get(),
+            migrants=self.training_view.migrants.get()
         )
         
         progress_window = self.create_progress_window(self.training_view.generation_limit.get())
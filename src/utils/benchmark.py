@@ -0,0 +1,130 @@
+"""Search benchmarks.
+
+Run with: python -m src.utils.benchmark
+"""
+import random
+import time
+from typing import List, Sequence, Tuple
+from src.ai import AI_ALGORITHMS
+from src.ai.search import GridSearch
+from src.game.engine import Engine, GAME_OVER
+
+def random_snake(rng: random.Random, grid_size: int, length: int) -> List[Tuple[int, int]]:
+    """A self-avoiding random walk, head first"""
+    while True:
+        body = [(rng.randrange(grid_size), rng.randrange(grid_size))]
+        occupied = set(body)
+        while len(body) < length:
+            x, y = body[-1]
+            options = [(x + dx, y + dy) for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]
+                       if 0 <= x + dx < grid_size and 0 <= y + dy < grid_size and (x + dx, y + dy) not in occupied]
+            if not options:
+                break
+            body.append(rng.choice(options))
+            occupied.add(body[-1])
+        if len(body) == length:
+            return body
+
+def compare_bidirectional(grid_size: int = 100, snake_length: int = 200, trials: int = 50,
+                          time_aware: bool = False, seed: int = 0) -> dict:
+    """Expansions and latency of one-directional vs bidirectional BFS
+    between the head and a far-away food cell"""
+    rng = random.Random(seed)
+    search = GridSearch(grid_size)
+    stats = {'bfs_expansions': 0, 'bfs_ms': 0.0, 'bidir_expansions': 0, 'bidir_ms': 0.0,
+             'trials': 0, 'same_length': 0}
+    while stats['trials'] < trials:
+        body = random_snake(rng, grid_size, snake_length)
+        occupied = set(body)
+        food = (rng.randrange(grid_size), rng.randrange(grid_size))
+        if food in occupied or abs(food[0] - body[0][0]) + abs(food[1] - body[0][1]) < grid_size // 2:
+            continue
+
+        start = time.perf_counter()
+        path = search.find_path(body[0], food, body, time_aware=time_aware)
+        stats['bfs_ms'] += (time.perf_counter() - start) * 1000
+        stats['bfs_expansions'] += search.expansions
+
+        start = time.perf_counter()
+        bidir_path = search.find_path(body[0], food, body, bidirectional=True, time_aware=time_aware)
+        stats['bidir_ms'] += (time.perf_counter() - start) * 1000
+        stats['bidir_expansions'] += search.expansions
+
+        stats['trials'] += 1
+        stats['same_length'] += len(path) == len(bidir_path)
+
+    for key in ('bfs_expansions', 'bfs_ms', 'bidir_expansions', 'bidir_ms'):
+        stats[key] /= trials
+    return stats
+
+def ida_star_depths(grid_size: int = 100, snake_length: int = 200, seed: int = 0) -> dict:
+    """Expansions per deepening iteration of IDA* for one far-away food cell"""
+    rng = random.Random(seed)
+    search = GridSearch(grid_size)
+    path = []
+    while not path:
+        body = random_snake(rng, grid_size, snake_length)
+        food = (rng.randrange(grid_size), rng.randrange(grid_size))
+        if food in body or abs(food[0] - body[0][0]) + abs(food[1] - body[0][1]) < grid_size // 2:
+            continue
+        search.load(body)
+        start = time.perf_counter()
+        path = search.ida_star(search.cell_of(body[0]), search.cell_of(food))
+    return {'path_length': len(path), 'ms': (time.perf_counter() - start) * 1000,
+            'expansions_per_depth': search.expansions_per_depth}
+
+def context_sharing(algorithms: Sequence[str] = ("smart_hybrid", "smarter_hybrid", "hybrid"),
+                    games: int = 3, max_steps: int = 3000, seed: int = 0) -> dict:
+    """Facts the composite AIs ask their move context for, and how many
+    it actually computed, playing the same games with caching off and on.
+    max_steps is long enough for most games to end, so the late-game
+    checks, where the sub-AIs ask for the same facts, get played too."""
+    results = {}
+    for name in algorithms:
+        results[name] = {}
+        for caching in (False, True):
+            ai = AI_ALGORITHMS[name]()
+            ai.context.caching = caching  # Sub-AIs share the same context
+            scores, moves = [], 0
+            start = time.perf_counter()
+            for game in range(games):
+                engine = Engine(rng=random.Random(seed + game), listeners=[ai])
+                while engine.steps < max_steps:
+                    ai.begin_move()
+                    body = engine.body
+                    if engine.step(*ai.get_next_move(body[0], engine.food, body)) in GAME_OVER:
+                        break
+                scores.append(engine.score)
+                moves += engine.steps
+            elapsed = time.perf_counter() - start
+            results[name]['cached' if caching else 'uncached'] = {
+                'scores': scores,
+                'ms_per_move': elapsed * 1000 / max(moves, 1),
+                'requests': dict(ai.context.requests),
+                'computations': dict(ai.context.computations)
+            }
+    return results
+
+def main():
+    for time_aware in (False, True):
+        stats = compare_bidirectional(time_aware=time_aware)
+        print(f"100x100, {'time-aware' if time_aware else 'static'} obstacles, {stats['trials']} trials")
+        print(f"  BFS:           {stats['bfs_expansions']:8.0f} expansions  {stats['bfs_ms']:7.2f} ms")
+        print(f"  Bidirectional: {stats['bidir_expansions']:8.0f} expansions  {stats['bidir_ms']:7.2f} ms")
+        print(f"  Same path length in {stats['same_length']}/{stats['trials']}")
+
+    stats = ida_star_depths()
+    print(f"100x100 IDA*: path of {stats['path_length']} in {stats['ms']:.2f} ms")
+    print(f"  Expansions per depth: {stats['expansions_per_depth']}")
+
+    for name, runs in context_sharing().items():
+        uncached, cached = runs['uncached'], runs['cached']
+        same = "same games" if uncached['scores'] == cached['scores'] else "GAMES DIFFER"
+        print(f"{name}: {uncached['ms_per_move']:.2f} ms/move without the shared context, "
+              f"{cached['ms_per_move']:.2f} ms/move with it ({same})")
+        for fact, requests in sorted(cached['requests'].items()):
+            computed = cached['computations'].get(fact, 0)
+            print(f"  {fact:22} {requests:7} requests  {computed:7} computed  {requests - computed:7} duplicates removed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Differential check of the game front-ends against the original rules.
+
+Both ways of playing (the interactive game loop, which
+run_normal_headless also runs, and BatchSimulator) go through
+Engine.step. This plays the same deterministic AIs and food seeds
+through each of them and through a copy of the list-based rules they
+used to implement separately, and reports the first move at which any
+of them sees a different body, food or score.
+
+It also checks that every deterministic AI with a native batch policy
+(get_next_moves over arrays) picks the same moves as its get_next_move,
+so batch scores belong to the AI whose name they carry, that the live
+game's fallback AI survives taking over a game in progress, and that the
+planners' VirtualSnake moves, eats, grows and undoes like the Engine.
+
+Run with: python -m src.utils.differential
+"""
+import random
+import sys
+from typing import Callable, List, Optional, Tuple
+import src.ui  # noqa: F401  (import order: src.game.game needs the UI package first)
+from src.ai import AI_ALGORITHMS
+from src.ai.base import BaseAI
+from src.ai.genetic import GeneticAI
+from src.ai.genetic_population import GeneticIndividual
+from src.ai.virtual_snake import VirtualSnake
+from src.game.batch import BatchSimulator
+from src.game.engine import ATE, BOARD_FULL, MOVED, Engine
+from src.game.frame_budget import FALLBACK
+from src.game.game import Game
+from src.utils.settings import GRID_SIZE
+
+State = Tuple[Tuple[Tuple[int, int], ...], Tuple[int, int], Tuple[int, int]]  # Body, food, move
+
+UNIT_MOVES = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+class Recorder(BaseAI):
+    """Wraps an AI and records every position it is asked about and its answer"""
+
+    def __init__(self, ai: BaseAI):
+        super().__init__()
+        self.ai = ai
+        self.name = ai.name
+        # Keeps run_normal_headless from cutting loops short; the reference plays them out
+        self.deterministic = False
+        self.trace: List[State] = []
+
+    def get_next_move(self, snake_head, food_pos, snake_body):
+        move = tuple(self.ai.get_next_move(snake_head, food_pos, snake_body))
+        self.trace.append((tuple(snake_body), tuple(food_pos), move))
+        return move
+
+def reference_game(ai: BaseAI, max_steps: int) -> None:
+    """The rules as the fast headless runner wrote them out before Engine existed"""
+    snake_body = [(GRID_SIZE // 2, GRID_SIZE // 2)]
+    food_pos = (GRID_SIZE - 5, GRID_SIZE - 5)
+    growing = False
+    for _ in range(max_steps):
+        dx, dy = ai.get_next_move(snake_body[0], food_pos, snake_body)
+        new_head = (snake_body[0][0] + dx, snake_body[0][1] + dy)
+        if not (0 <= new_head[0] < GRID_SIZE and 0 <= new_head[1] < GRID_SIZE):
+            return
+        if new_head in snake_body[:-1] or (new_head in snake_body and not growing):
+            return
+        snake_body.insert(0, new_head)
+        if not growing:
+            snake_body.pop()
+        growing = False
+        if new_head == food_pos:
+            growing = True
+            available_positions = [
+                (x, y) for x in range(GRID_SIZE) for y in range(GRID_SIZE)
+                if (x, y) not in snake_body
+            ]
+            if not available_positions:
+                return
+            distant_positions = [
+                pos for pos in available_positions
+                if abs(pos[0] - new_head[0]) + abs(pos[1] - new_head[1]) > 3
+            ]
+            food_pos = random.choice(distant_positions if distant_positions else available_positions)
+
+def play_reference(make_ai: Callable[[], BaseAI], seed: int, max_steps: int) -> List[State]:
+    recorder = Recorder(make_ai())
+    random.seed(seed)
+    reference_game(recorder, max_steps)
+    return recorder.trace
+
+def play_interactive(make_ai: Callable[[], BaseAI], seed: int, max_steps: int) -> List[State]:
+    recorder = Recorder(make_ai())
+    game = Game(start_with_ai=True, headless=True, ai_algorithm="bfs")
+    game.input_handler.current_ai = recorder
+    random.seed(seed)
+    game.run_normal_headless(max_steps, max_steps_without_food=max_steps)
+    return recorder.trace
+
+def play_batch(make_ai: Callable[[], BaseAI], seed: int, max_steps: int) -> List[State]:
+    recorder = Recorder(make_ai())
+    BatchSimulator(recorder, 1, max_steps=max_steps, seed=seed).run()
+    return recorder.trace
+
+FRONT_ENDS = [("interactive", play_interactive), ("batch", play_batch)]
+
+def first_difference(reference: List[State], trace: List[State], steering: bool) -> Optional[int]:
+    """Index of the first state where trace leaves reference, or None.
+    Steering front-ends turn the snake instead of placing the head, so a
+    reversal or a non-move plays differently there by design and the
+    comparison stops at the first one."""
+    direction = (1, 0)  # Snake starts heading right
+    for index, (expected, actual) in enumerate(zip(reference, trace)):
+        if expected != actual:
+            return index
+        move = expected[2]
+        if steering:
+            if move not in UNIT_MOVES or move == (-direction[0], -direction[1]):
+                return None
+            direction = move
+    if len(reference) != len(trace) and not steering:
+        return min(len(reference), len(trace))
+    return None
+
+def check(make_ai: Callable[[], BaseAI], seed: int, max_steps: int) -> List[Tuple[str, int, Optional[int]]]:
+    """(front-end, moves compared, first differing move or None) for one game"""
+    reference = play_reference(make_ai, seed, max_steps)
+    results = []
+    for name, play in FRONT_ENDS:
+        trace = play(make_ai, seed, max_steps)
+        results.append((name, min(len(reference), len(trace)),
+                        first_difference(reference, trace, steering=(name == "interactive"))))
+    return results
+
+class BatchChecker(BaseAI):
+    """Plays a batch-native AI's batched moves and counts the games where
+    its get_next_move would have moved differently"""
+
+    def __init__(self, ai: BaseAI):
+        super().__init__()
+        self.ai = ai
+        self.name = ai.name
+        self.compared = 0
+        self.disagreements = 0
+        self.first: Optional[Tuple[Tuple[int, int], Tuple[int, int], Tuple[int, int], Tuple[int, int]]] = None
+
+    def get_next_moves(self, heads, foods, occupancy, bodies=None):
+        moves = self.ai.get_next_moves(heads, foods, occupancy)
+        for body, food, batched in zip(bodies, foods.tolist(), moves.tolist()):
+            self.ai.begin_move()
+            single = tuple(self.ai.get_next_move(body[0], tuple(food), body))
+            self.compared += 1
+            if single != tuple(batched):
+                self.disagreements += 1
+                if self.first is None:
+                    self.first = (body[0], tuple(food), tuple(batched), single)
+        return moves
+
+def batch_agreement(make_ai: Callable[[], BaseAI], games: int, seed: int, max_steps: int) -> BatchChecker:
+    """Play games in lockstep through BatchSimulator, checking every batched move"""
+    checker = BatchChecker(make_ai())
+    BatchSimulator(checker, games, max_steps=max_steps, seed=seed).run()
+    return checker
+
+def batch_players() -> List[Tuple[str, Callable[[], BaseAI]]]:
+    """Every deterministic AI with a native batch policy"""
+    players = [(name, make_ai) for name, make_ai in AI_ALGORITHMS.items()
+               if make_ai.batch_native and make_ai.deterministic]
+    players.append(("genetic_individual", GeneticIndividual))
+    return players
+
+def takeover(primary: str, seed: int, length: int = 40, moves: int = 400) -> Tuple[int, Optional[str]]:
+    """Play primary until the snake is length long, let the live game step
+    down to its fallback AI the way repeatedly missed frames make it, then
+    play on; returns (fallback moves survived, collision or None)"""
+    game = Game(start_with_ai=True, headless=True, ai_algorithm=primary)
+    random.seed(seed)
+    for _ in range(GRID_SIZE * GRID_SIZE * 10):
+        if len(game.snake.body) >= length:
+            break
+        if not game.step():
+            return 0, f"{primary} died first"
+    frame = 1.0 / game.current_speed
+    while game.frame_budget.mode != FALLBACK:
+        game._track_move_time(2 * frame, frame)
+    for move in range(moves):
+        if not game.step():
+            return move, game.snake.collision
+        if game.engine.food_cell < 0:
+            break  # Board full
+    return moves, None
+
+def virtual_agreement(seed: int, moves: int = 3000, grid_size: int = 8) -> Optional[int]:
+    """Make and unmake the same random moves on an Engine and a
+    VirtualSnake; returns the first move at which they disagree on whether
+    the move is legal, the occupancy, the length or the pending growth"""
+    rng = random.Random(seed)
+    engine = Engine(grid_size, rng=random.Random(seed))
+    engine.reset()
+    snake = VirtualSnake(grid_size=grid_size)
+    snake.load(engine.body)
+    for move in range(moves):
+        if engine.depth and rng.random() < 0.2:
+            engine.unmake()
+            snake.undo()
+        else:
+            dx, dy = rng.choice(UNIT_MOVES)
+            head = engine.head_cell()
+            x, y = head % grid_size + dx, head // grid_size + dy
+            eats = y * grid_size + x == engine.food_cell
+            result = engine.make(dx, dy)
+            if (result in (MOVED, ATE)) != snake.advance((x, y), eat=eats):
+                return move
+            if result == BOARD_FULL:
+                return None
+        if (engine.occupied != snake.occupied or engine.length != snake.length
+                or engine.growing != snake.pending):
+            return move
+    return None
+
+def main(seeds: int = 5, max_steps: int = 1500) -> int:
+    weights = {'food_distance': 0.9, 'wall_distance': -0.1, 'tail_distance': 0.3, 'space_freedom': 0.6}
+    players = [
+        ("bfs", AI_ALGORITHMS["bfs"]),
+        ("dijkstra", AI_ALGORITHMS["dijkstra"]),
+        ("wall_follower", AI_ALGORITHMS["wall_follower"]),
+        ("genetic", lambda: GeneticAI(weights=dict(weights))),
+    ]
+    mismatches = 0
+    for name, make_ai in players:
+        for seed in range(seeds):
+            for front_end, compared, difference in check(make_ai, seed, max_steps):
+                status = "agree" if difference is None else f"DIFFER at move {difference}"
+                mismatches += difference is not None
+                print(f"{name:14} seed {seed}  {front_end:12} {compared:5} moves  {status}")
+    for name, make_ai in batch_players():
+        checker = batch_agreement(make_ai, games=16, seed=0, max_steps=max_steps)
+        mismatches += checker.disagreements > 0
+        status = "agree" if checker.first is None else (
+            "DIFFER, first at head {} food {}: batched {} vs single {}".format(*checker.first))
+        print(f"{name:14} batch vs single {checker.compared:6} moves  {status}")
+    for seed in range(8):
+        survived, collision = takeover("smart_hybrid", seed)
+        mismatches += collision is not None
+        status = "survived" if collision is None else f"DIED ({collision})"
+        print(f"fallback       seed {seed}  takeover     {survived:5} moves  {status}")
+    for seed in range(seeds):
+        difference = virtual_agreement(seed)
+        mismatches += difference is not None
+        status = "agree" if difference is None else f"DIFFER at move {difference}"
+        print(f"virtual_snake  seed {seed}  engine       {status}")
+    print(f"{mismatches} mismatches")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
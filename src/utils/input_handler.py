@@ -4,12 +4,15 @@ from src.ai import AI_ALGORITHMS
 import os
 import json
 import logging
+from src.utils.settings import UP, RIGHT, DOWN, LEFT, DELTA_DIRECTIONS
 
 if TYPE_CHECKING:
     from src.game.snake import Snake
     from src.game.food import Food
     from src.ai.base import BaseAI
 
+KEY_DIRECTIONS = {pygame.K_UP: UP, pygame.K_RIGHT: RIGHT, pygame.K_DOWN: DOWN, pygame.K_LEFT: LEFT}
+
 class InputHandler:
     def __init__(self):
         self.control_type = "human"  # "human" or "ai"
@@ -17,11 +20,19 @@ class InputHandler:
         self.current_ai_name: Optional[str] = None
         self.current_path: List[Tuple[int, int]] = []
         self.genetic_individual = None
+        self.ai_instance: Optional['BaseAI'] = None  # Existing AI to play instead of building one
+        self.move_budget: Optional[float] = None  # Seconds per AI move, None for unlimited
+        self.max_nodes: Optional[int] = None  # Search nodes per AI move, None for unlimited
     
     def set_genetic_individual(self, individual):
         """Set the genetic individual for genetic algorithm mode"""
         self.genetic_individual = individual
     
+    def set_ai_instance(self, ai: Optional['BaseAI']) -> None:
+        """Play an AI object that already exists (one kept from an earlier
+        game, say) instead of building a new one of current_ai_name"""
+        self.ai_instance = ai
+    
     def set_control_type(self, control_type: str) -> None:
         """Set the control type and initialize AI if needed"""
         self.control_type = control_type
@@ -41,28 +52,37 @@ class InputHandler:
                 else:
                     logging.error(f"Trained model not found: {model_path}")
                     self.current_ai = None
+            elif self.ai_instance is not None:
+                self.current_ai = self.ai_instance
+            elif self.current_ai_name == "genetic" and self.genetic_individual is not None:
+                # Play the individual being trained rather than a fresh random one
+                self.current_ai = self.genetic_individual
             else:
                 # Initialize standard AI algorithm
                 ai_class = AI_ALGORITHMS[self.current_ai_name]
                 self.current_ai = ai_class()
+            if self.current_ai:
+                self.current_ai.set_move_budget(self.move_budget, self.max_nodes)
             self.current_path = []
     
+    def set_move_budget(self, time_limit: Optional[float], max_nodes: Optional[int] = None) -> None:
+        """Set the per-move time (and node) budget of the current (and any later) AI"""
+        self.move_budget = time_limit
+        self.max_nodes = max_nodes
+        if self.current_ai:
+            self.current_ai.set_move_budget(time_limit, max_nodes)
+    
     def handle_input(self, event: Optional[pygame.event.Event], snake: 'Snake', food: 'Food') -> None:
         """Handle input from either human player or AI"""
         if self.control_type == "human":
             if event and event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    snake.set_direction("UP")
-                elif event.key == pygame.K_DOWN:
-                    snake.set_direction("DOWN")
-                elif event.key == pygame.K_LEFT:
-                    snake.set_direction("LEFT")
-                elif event.key == pygame.K_RIGHT:
-                    snake.set_direction("RIGHT")
+                if event.key in KEY_DIRECTIONS:
+                    snake.set_direction(KEY_DIRECTIONS[event.key])
                 elif event.key == pygame.K_c:
                     self.renderer.cycle_snake_color()
         elif self.control_type == "ai" and self.current_ai:
             # Get the next move from AI with proper parameters
+            self.current_ai.begin_move()
             direction = self.current_ai.get_next_move(
                 snake.body[0],  # snake head
                 food.position,  # food position
@@ -73,15 +93,10 @@ class InputHandler:
             if hasattr(self.current_ai, 'current_path'):
                 self.current_path = self.current_ai.current_path
             
-            # Convert direction vector to direction string
-            if direction == (0, -1):
-                snake.set_direction("UP")
-            elif direction == (0, 1):
-                snake.set_direction("DOWN")
-            elif direction == (-1, 0):
-                snake.set_direction("LEFT")
-            elif direction == (1, 0):
-                snake.set_direction("RIGHT")
+            # Convert the direction vector; anything but a unit move is ignored
+            direction = DELTA_DIRECTIONS.get(tuple(direction))
+            if direction is not None:
+                snake.set_direction(direction)
     
     def get_current_ai_name(self) -> Optional[str]:
         """Get the name of the current AI algorithm"""
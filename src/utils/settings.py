@@ -9,6 +9,22 @@ CELL_PADDING = 4
 # Game settings
 FPS = 10
 FOOD_SIZE_FACTOR = 0.4
+AI_MOVE_BUDGET_FRACTION = 0.5  # Share of each frame the AI may spend choosing a move
+
+# Stepping the live game's AI down when its moves miss the frame (FrameBudgetController)
+DEGRADE_FALLBACK_AI = "safe_greedy"  # Cheap AI played when a reduced search is still too slow; must be safe to take over mid-game
+DEGRADE_AFTER = 3              # Moves over the frame time, out of the last DEGRADE_WINDOW, to step down
+DEGRADE_WINDOW = 10
+RECOVER_AFTER = 20             # Moves in a row with headroom to step back up
+RECOVER_HEADROOM = 0.25        # A move has headroom when it takes at most this share of the frame
+RECOVER_MAX_BACKOFF = 8        # Cap on how many times RECOVER_AFTER a repeat offender waits
+REDUCED_BUDGET_FRACTION = 0.25  # Share of the usual move budget in reduced mode
+REDUCED_MAX_NODES = 2000       # Search nodes per move in reduced mode
+
+# Genetic training (TrainingManager), the training view's starting values
+TRAINING_ISLANDS = 1           # Populations evolved in separate processes; 1 trains one population
+MIGRATION_INTERVAL = 5         # Generations between islands trading their best individuals
+MIGRANTS = 2                   # Individuals each island sends per migration
 
 # Colors
 BACKGROUND = (15, 15, 15)  # Very dark grey, almost black
@@ -25,6 +41,14 @@ GAME_OVER_COLOR = (224, 108, 117)
 TITLE_COLOR = (152, 195, 121)
 START_TEXT_COLOR = (255, 255, 255)
 
+# Directions are small ints indexing these tables; (dx, dy) vectors and
+# names only appear where AIs answer and at the compatibility boundary
+UP, RIGHT, DOWN, LEFT = 0, 1, 2, 3
+DIRECTION_DELTAS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+DIRECTION_NAMES = ["UP", "RIGHT", "DOWN", "LEFT"]
+OPPOSITE = [DOWN, LEFT, UP, RIGHT]
+DELTA_DIRECTIONS = {delta: direction for direction, delta in enumerate(DIRECTION_DELTAS)}
+
 # Game settings
 INITIAL_DIRECTION = (1, 0)
 INITIAL_POSITION = (GRID_SIZE // 2, GRID_SIZE // 2)